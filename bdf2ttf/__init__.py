@@ -0,0 +1,8 @@
+# Converter is imported lazily, so that tools which don't convert fonts (like
+# yml2fea) don't pay for importing fontTools.
+def __getattr__(name):
+    if name == "Converter":
+        from bdf2ttf.converter import Converter
+        return Converter
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,132 @@
+"""
+Convert fonts from asyncio code without blocking the event loop.
+
+Reading the input and writing the output happen in small steps on an
+executor, and parsing and outlining run entirely on it. By default the event
+loop's default thread pool is used; pass a ProcessPoolExecutor to use several
+CPUs. A bounded semaphore limits how many conversions are in flight, so a
+large batch never holds every input in memory at once.
+"""
+
+import asyncio
+import functools
+import io
+import os
+
+from bdf2ttf import batch, convert, feature_cache
+from bdf2ttf.converter import LRUCache
+
+
+CHUNK_SIZE = 1 << 16
+DEFAULT_LIMIT = 8
+
+
+# Shared by all conversions running in this process (or in one worker
+# process, when using a process pool).
+_outlines = LRUCache(65536)
+
+
+# Runs on the executor. Returns the PostScript name of the font, which names
+# the output file by default, along with the TTF data.
+def _convert(bdf_data, feature_text):
+    font, tt_font = convert.build_opentype(
+        io.BytesIO(bdf_data),
+        io.StringIO(feature_text) if feature_text != None else None,
+        features=feature_cache.default_cache,
+        outline_cache=_outlines,
+    )
+
+    return font.postscript_name, convert.font_bytes(tt_font)
+
+
+async def _run(executor, function, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(function, *args))
+
+
+# Read a whole file, one chunk at a time, giving the event loop a chance to run
+# between chunks.
+async def read_file_async(filename, chunk_size=CHUNK_SIZE):
+    stream = await _run(None, open, filename, "rb")
+    try:
+        chunks = []
+        while True:
+            chunk = await _run(None, stream.read, chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        await _run(None, stream.close)
+
+    return b"".join(chunks)
+
+
+# Convert BDF data to TTF data on the executor.
+async def convert_bytes_async(bdf_data, feature_text=None, executor=None):
+    _, data = await _run(executor, _convert, bytes(bdf_data), feature_text)
+    return data
+
+
+async def _convert_file(infile, outfile, feature_file, executor):
+    bdf_data = await read_file_async(infile)
+
+    feature_text = None
+    if feature_file != None:
+        feature_text = (await read_file_async(feature_file)).decode()
+
+    postscript_name, data = await _run(executor, _convert, bdf_data, feature_text)
+
+    if outfile == None:
+        outfile = f"{postscript_name}.ttf"
+
+    # If the conversion is cancelled before this point, nothing is written.
+    # Once the write has started on the executor, cancelling can't stop it:
+    # the file is still written in full, but the conversion is reported as
+    # cancelled.
+    await _run(None, convert.write_atomic, data, outfile)
+
+    return outfile
+
+
+# Convert a BDF file, and return the name of the TTF file written.
+# If semaphore is given, the conversion waits for it before reading anything.
+async def convert_async(infile, outfile=None, feature_file=None, executor=None, semaphore=None):
+    if semaphore == None:
+        return await _convert_file(infile, outfile, feature_file, executor)
+
+    async with semaphore:
+        return await _convert_file(infile, outfile, feature_file, executor)
+
+
+# Convert many BDF files, with at most limit conversions in flight. Returns a
+# list of (infile, font_filename, error) tuples, in the same order as infiles.
+# Cancelling this coroutine cancels every conversion that hasn't finished. A
+# conversion cancelled before its output starts being written never writes
+# it; one cancelled while writing still finishes the file.
+async def convert_many_async(infiles, out_dir=None, feature_file=None, limit=DEFAULT_LIMIT,
+                             executor=None):
+    if out_dir != None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    semaphore = asyncio.Semaphore(limit)
+    tasks = [
+        asyncio.ensure_future(convert_async(
+            infile,
+            batch.output_filename(infile, out_dir),
+            feature_file,
+            executor=executor,
+            semaphore=semaphore,
+        ))
+        for infile in infiles
+    ]
+
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = []
+    for infile, outcome in zip(infiles, outcomes):
+        if isinstance(outcome, BaseException):
+            results.append((infile, None, batch.describe_error(outcome)))
+        else:
+            results.append((infile, os.fspath(outcome), None))
+
+    return results
@@ -0,0 +1,163 @@
+"""
+Convert many bitmap fonts in one run.
+
+Conversions run on a pool of worker processes. Each worker imports fontTools
+once and then converts fonts until the batch is done, so the import cost is
+paid once per worker instead of once per font.
+"""
+
+import glob
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from bdf2ttf import convert, feature_cache
+
+
+BITMAP_FONT_PATTERNS = ("*.bdf",)
+
+
+# Expand directories and glob patterns into a list of font files. Directories
+# are searched recursively for BDF files. Duplicates are dropped, but the order
+# of the inputs is kept.
+def expand_inputs(inputs):
+    infiles = []
+
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = []
+            for pattern in BITMAP_FONT_PATTERNS:
+                matches.extend(glob.glob(os.path.join(item, "**", pattern), recursive=True))
+            infiles.extend(sorted(matches))
+        elif glob.has_magic(item):
+            infiles.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            infiles.append(item)
+
+    return list(dict.fromkeys(infiles))
+
+
+def output_filename(infile, out_dir):
+    if out_dir == None:
+        # Named after the font, in the current directory
+        return None
+
+    stem = os.path.splitext(os.path.basename(infile))[0]
+    return os.path.join(out_dir, f"{stem}.ttf")
+
+
+def manifest_filename(infile, manifest_dir):
+    if manifest_dir == None:
+        return None
+
+    stem = os.path.splitext(os.path.basename(infile))[0]
+    return os.path.join(manifest_dir, f"{stem}.json")
+
+
+# Raise ValueError if two of infiles would be written to the same output or
+# manifest file. Inputs found in different directories can share a name, but
+# their outputs all go in out_dir.
+def check_output_names(infiles, out_dir=None, manifest_dir=None):
+    for directory, filename in ((out_dir, output_filename), (manifest_dir, manifest_filename)):
+        if directory == None:
+            continue
+
+        seen = {}
+        for infile in infiles:
+            name = filename(infile, directory)
+            if name in seen:
+                raise ValueError(f"{seen[name]} and {infile} would both be written to {name}")
+            seen[name] = infile
+
+
+def describe_error(error):
+    message = str(error)
+    if message:
+        return f"{type(error).__name__}: {message}"
+    else:
+        return type(error).__name__
+
+
+# Convert one font, and return (infile, font_filename, error). Errors are
+# returned as strings so that one bad font doesn't stop the batch.
+def convert_one(infile, out_dir=None, feature_file_name=None, manifest_dir=None, cache_dir=None,
+                formats=None, format_options=None, glyph_filter=None, device_ppems=None,
+                bitmap_strikes=None, post_format=2, optimize_order=False, ranking=None):
+    try:
+        font_filename = convert.convert_bdf_file(
+            infile,
+            output_filename(infile, out_dir),
+            feature_file_name,
+            manifest_file=manifest_filename(infile, manifest_dir),
+            features=feature_cache.shared_cache(cache_dir),
+            formats=formats,
+            format_options=format_options,
+            glyph_filter=glyph_filter,
+            device_ppems=device_ppems,
+            bitmap_strikes=bitmap_strikes,
+            post_format=post_format,
+            optimize_order=optimize_order,
+            ranking=ranking,
+        )
+    except Exception as error:
+        return (infile, None, describe_error(error))
+
+    if isinstance(font_filename, list):
+        return (infile, ", ".join(map(os.fspath, font_filename)), None)
+
+    return (infile, os.fspath(font_filename), None)
+
+
+# Convert every file in infiles, using up to jobs worker processes. If jobs is
+# None, one worker is started per CPU. Returns a list of (infile,
+# font_filename, error) tuples, in the same order as infiles. Raises
+# ValueError, before converting anything, if two inputs would be written to
+# the same file.
+def convert_many(infiles, out_dir=None, feature_file_name=None, manifest_dir=None,
+                 cache_dir=None, jobs=None, formats=None, format_options=None,
+                 glyph_filter=None, device_ppems=None, bitmap_strikes=None, post_format=2,
+                 optimize_order=False, ranking=None):
+    check_output_names(infiles, out_dir, manifest_dir)
+
+    if out_dir != None:
+        os.makedirs(out_dir, exist_ok=True)
+    if manifest_dir != None:
+        os.makedirs(manifest_dir, exist_ok=True)
+
+    options = {
+        "out_dir": out_dir,
+        "feature_file_name": feature_file_name,
+        "manifest_dir": manifest_dir,
+        "cache_dir": cache_dir,
+        "formats": formats,
+        "format_options": format_options,
+        "glyph_filter": glyph_filter,
+        "device_ppems": device_ppems,
+        "bitmap_strikes": bitmap_strikes,
+        "post_format": post_format,
+        "optimize_order": optimize_order,
+        "ranking": ranking,
+    }
+
+    if jobs == 1 or len(infiles) <= 1:
+        return [convert_one(infile, **options) for infile in infiles]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(convert_one, infile, **options) for infile in infiles]
+        return [future.result() for future in futures]
+
+
+def print_summary(results, stream=sys.stderr):
+    failures = 0
+
+    for infile, font_filename, error in results:
+        if error:
+            failures += 1
+            print(f"FAILED  {infile}: {error}", file=stream)
+        else:
+            print(f"ok      {infile} -> {font_filename}", file=stream)
+
+    print(f"{len(results) - failures} converted, {failures} failed", file=stream)
+
+    return failures
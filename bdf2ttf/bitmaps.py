@@ -0,0 +1,283 @@
+"""
+Embed the bitmaps of BDF fonts as EBDT and EBLC strikes.
+
+At the sizes it is drawn at, a pixel font looks best, and draws fastest, as
+the bitmaps it was drawn with. Each strike holds the glyphs of one BDF font at
+its own pixel size, in the glyph order of the converted font, next to the
+outlines. Rasterizers use a strike at its exact size, and the outlines at any
+other size.
+
+Index subtables are kept few and small. A run of consecutive glyphs with the
+same bitmap size and metrics shares one fixed-size subtable, and the glyphs
+store only their bits. Other glyphs store small metrics with their bits, and
+share a subtable of 16-bit offsets with their neighbours.
+"""
+
+import logging
+
+from fontTools.ttLib import newTable
+from fontTools.ttLib.tables.BitmapGlyphMetrics import BigGlyphMetrics, SmallGlyphMetrics
+from fontTools.ttLib.tables.E_B_D_T_ import ebdt_bitmap_classes
+from fontTools.ttLib.tables.E_B_L_C_ import SbitLineMetrics, Strike, eblc_sub_table_classes
+
+
+log = logging.getLogger("bdf2ttf")
+
+# Runs of at least this many consecutive glyphs with the same metrics get a
+# fixed-size subtable of their own.
+MIN_FIXED_RUN = 4
+
+# An offset subtable skips up to this many missing glyphs, at two bytes each,
+# before a new subtable is started.
+MAX_SKIPPED = 8
+
+# Offset subtables store 16-bit offsets into the glyph data
+MAX_SUBTABLE_DATA = 0xFFFF
+
+# Small glyph metrics, in bytes, stored before the bits of each glyph in an
+# offset subtable
+SMALL_METRICS_SIZE = 5
+
+
+def _in_range(value, low, high):
+    return low <= value <= high
+
+
+# Return (height, width, bearing_x, bearing_y, advance) for a BDF glyph, or
+# None if the values don't fit in a strike.
+def glyph_metrics(bdf_glyph):
+    metrics = (
+        bdf_glyph.bbH,
+        bdf_glyph.bbW,
+        bdf_glyph.bbX,
+        bdf_glyph.bbY + bdf_glyph.bbH,
+        bdf_glyph.advance,
+    )
+    height, width, bearing_x, bearing_y, advance = metrics
+    if not (
+        _in_range(height, 0, 255) and _in_range(width, 0, 255) and _in_range(advance, 0, 255)
+        and _in_range(bearing_x, -128, 127) and _in_range(bearing_y, -128, 127)
+    ):
+        return None
+
+    return metrics
+
+
+# Pack the rows of a BDF glyph, top row first, with no padding between rows.
+def glyph_image(bdf_glyph):
+    width = bdf_glyph.bbW
+    height = bdf_glyph.bbH
+    mask = (1 << width) - 1
+
+    bits = 0
+    # bdflib stores the bottom row first
+    for row in reversed(bdf_glyph.data[:height]):
+        bits = (bits << width) | (row & mask)
+
+    size = (width * height + 7) // 8
+    bits <<= size * 8 - width * height
+    return bits.to_bytes(size, "big")
+
+
+# Return (glyph_id, name, metrics, image) for each glyph of strike_font that
+# font also has, in font's glyph order. Glyphs are matched by name, or failing
+# that by codepoint.
+def strike_glyphs(font, strike_font):
+    glyph_ids = {name: glyph_id for glyph_id, name in enumerate(font.glyph_order())}
+    by_codepoint = {
+        codepoint: name
+        for name, (_, codepoint, _) in font.glyphs.items()
+        if codepoint >= 0
+    }
+
+    entries = {}
+    for name, bdf_glyph in strike_font.bdf_glyphs.items():
+        codepoint = strike_font.glyphs[name][1]
+        if name not in glyph_ids:
+            name = by_codepoint.get(codepoint)
+        if name == None or name in entries:
+            continue
+
+        metrics = glyph_metrics(bdf_glyph)
+        if metrics == None:
+            log.info("%s is too big for the %dpx strike, so it is left out",
+                     name, strike_font.font_size)
+            continue
+
+        entries[name] = (glyph_ids[name], name, metrics, glyph_image(bdf_glyph))
+
+    return sorted(entries.values())
+
+
+def _new_subtable(index_format, image_format, names):
+    subtable = eblc_sub_table_classes[index_format](None, None)
+    subtable.indexFormat = index_format
+    subtable.imageFormat = image_format
+    subtable.names = names
+    return subtable
+
+
+def _big_metrics(metrics, font_size):
+    height, width, bearing_x, bearing_y, advance = metrics
+
+    big = BigGlyphMetrics()
+    big.height = height
+    big.width = width
+    big.horiBearingX = bearing_x
+    big.horiBearingY = bearing_y
+    big.horiAdvance = advance
+    big.vertBearingX = -(width // 2)
+    big.vertBearingY = 0
+    big.vertAdvance = font_size
+    return big
+
+
+def _small_metrics(metrics):
+    height, width, bearing_x, bearing_y, advance = metrics
+
+    small = SmallGlyphMetrics()
+    small.height = height
+    small.width = width
+    small.BearingX = bearing_x
+    small.BearingY = bearing_y
+    small.Advance = advance
+    return small
+
+
+def _bitmap(image_format, image, metrics=None):
+    bitmap = ebdt_bitmap_classes[image_format](None, None)
+    bitmap.imageData = image
+    if metrics != None:
+        bitmap.metrics = metrics
+    return bitmap
+
+
+# Split the entries of a strike into runs of consecutive glyph IDs with the
+# same metrics.
+def _runs(entries):
+    runs = []
+    for entry in entries:
+        if runs:
+            last = runs[-1][-1]
+            if entry[0] == last[0] + 1 and entry[2] == last[2]:
+                runs[-1].append(entry)
+                continue
+        runs.append([entry])
+
+    return runs
+
+
+# Group the entries of a strike into index subtables. Returns a list of
+# (fixed, entries) tuples, in glyph order.
+def group_subtables(entries):
+    groups = []
+    offsets = None
+
+    for run in _runs(entries):
+        metrics = run[0][2]
+        if len(run) >= MIN_FIXED_RUN and metrics[0] * metrics[1] > 0:
+            groups.append((True, run))
+            offsets = None
+            continue
+
+        for entry in run:
+            size = SMALL_METRICS_SIZE + len(entry[3])
+            if (
+                offsets == None
+                or entry[0] - offsets["last_id"] > MAX_SKIPPED + 1
+                or offsets["size"] + size > MAX_SUBTABLE_DATA
+            ):
+                offsets = {"entries": [], "size": 0}
+                groups.append((False, offsets["entries"]))
+
+            offsets["entries"].append(entry)
+            offsets["size"] += size
+            offsets["last_id"] = entry[0]
+
+    return groups
+
+
+def _line_metrics(strike_font, entries):
+    metrics = SbitLineMetrics()
+    metrics.ascender = strike_font.ascent
+    metrics.descender = -strike_font.descent
+    metrics.widthMax = max(entry[2][1] for entry in entries)
+    metrics.caretSlopeNumerator = 1
+    metrics.caretSlopeDenominator = 0
+    metrics.caretOffset = 0
+    metrics.minOriginSB = min(entry[2][2] for entry in entries)
+    metrics.minAdvanceSB = min(entry[2][4] - entry[2][2] - entry[2][1] for entry in entries)
+    metrics.maxBeforeBL = max(entry[2][3] for entry in entries)
+    metrics.minAfterBL = min(entry[2][3] - entry[2][0] for entry in entries)
+    metrics.pad1 = 0
+    metrics.pad2 = 0
+    return metrics
+
+
+# Build one strike of the EBLC table, and the matching glyph data for EBDT.
+def build_strike(font, strike_font):
+    entries = strike_glyphs(font, strike_font)
+    if not entries:
+        return None, None
+
+    strike = Strike()
+    glyph_data = {}
+
+    for fixed, group in group_subtables(entries):
+        names = [name for _, name, _, _ in group]
+        if fixed:
+            # Index format 2, image format 5: metrics and size in the subtable
+            subtable = _new_subtable(2, 5, names)
+            subtable.imageSize = len(group[0][3])
+            subtable.metrics = _big_metrics(group[0][2], strike_font.font_size)
+            for _, name, _, image in group:
+                glyph_data[name] = _bitmap(5, image)
+        else:
+            # Index format 3, image format 2: small metrics with each glyph
+            subtable = _new_subtable(3, 2, names)
+            for _, name, metrics, image in group:
+                glyph_data[name] = _bitmap(2, image, _small_metrics(metrics))
+
+        strike.indexSubTables.append(subtable)
+
+    size = strike.bitmapSizeTable
+    size.colorRef = 0
+    size.hori = _line_metrics(strike_font, entries)
+    size.vert = _line_metrics(strike_font, entries)
+    size.ppemX = strike_font.font_size
+    size.ppemY = strike_font.font_size
+    size.bitDepth = 1
+    # Horizontal metrics
+    size.flags = 1
+
+    return strike, glyph_data
+
+
+# Add EBDT and EBLC tables to tt_font, the converted font, with a strike for
+# each of strike_fonts. font is the bdf2ttf Font that tt_font was built from,
+# and strike_fonts are Fonts at other sizes, usually including font itself.
+def add_bitmap_strikes(tt_font, font, strike_fonts):
+    sizes = [strike_font.font_size for strike_font in strike_fonts]
+    if len(set(sizes)) != len(sizes):
+        raise ValueError(f"more than one bitmap strike for the same size: {sorted(sizes)}")
+
+    strikes = []
+    strike_data = []
+    for strike_font in sorted(strike_fonts, key=lambda strike_font: strike_font.font_size):
+        strike, glyph_data = build_strike(font, strike_font)
+        if strike != None:
+            strikes.append(strike)
+            strike_data.append(glyph_data)
+
+    if not strikes:
+        return
+
+    eblc = newTable("EBLC")
+    eblc.version = 2.0
+    eblc.strikes = strikes
+    tt_font["EBLC"] = eblc
+
+    ebdt = newTable("EBDT")
+    ebdt.version = 2.0
+    ebdt.strikeData = strike_data
+    tt_font["EBDT"] = ebdt
@@ -0,0 +1,279 @@
+"""
+Build a set of fonts and feature files described by a YAML manifest.
+
+Expected YAML syntax::
+
+    # Optional. Holds manifests and cached features, so unchanged outputs can
+    # be skipped. Defaults to .bdf2ttf next to the manifest.
+    state_dir: <directory>
+    features:
+      # Feature files generated by yml2fea
+      - source: <YAML ligature file>
+        output: <feature file to write>
+    fonts:
+      - source: <BDF file>
+        output: <TTF file to write>
+        feature_file: <Optional feature file. May be the output of a
+                      features entry.>
+        # Optional. The formats to write, like [ttf, woff] or "ttf,otf".
+        # Formats other than the one output names get its extension replaced.
+        formats: <list of formats>
+
+All paths are relative to the manifest. Each output is a node in a dependency
+graph: a font depends on the feature file it uses, if that feature file is
+generated. Nodes whose dependencies are done run in parallel on a process pool.
+A node whose inputs haven't changed since its last build is skipped.
+
+Compiled features are cached in memory by each worker process, and on disk in
+the state directory, keyed by the feature file and the glyph order. A font can
+reuse features compiled for another font with the same glyph order, but fonts
+built at the same time in different processes may each compile them, and
+fonts with different glyph orders always do.
+"""
+
+import argparse
+import os
+import sys
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import yaml
+
+from bdf2ttf import batch, convert, feature, feature_cache, formats as output_formats, manifest
+
+
+class Task:
+    def __init__(self, output, function, args, dependencies=()):
+        self.output = output
+        self.function = function
+        self.args = args
+        self.dependencies = list(dependencies)
+
+
+class ManifestError(Exception):
+    pass
+
+
+def _output_stamp(filename):
+    try:
+        return os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
+
+
+# The stamps of every file in a directory, by absolute path. A conversion can
+# write files other than the output it was given, like the parts of a split
+# font, so their names are only known afterwards.
+def _directory_stamps(directory):
+    with os.scandir(directory or ".") as entries:
+        return {os.path.abspath(entry.path): entry.stat().st_mtime_ns for entry in entries}
+
+
+# Where the manifest for an output is stored. output is relative to the build
+# manifest.
+def _state_file(state_dir, output):
+    name = output.replace(os.sep, "_")
+    return os.path.join(state_dir, "manifests", f"{name}.json")
+
+
+# Each build function returns True if the output was written, or False if it
+# was already up to date.
+def build_feature_file(source, output, state_file):
+    record = manifest.fingerprint(source, options={"yml2fea": output})
+    if manifest.up_to_date(state_file, record):
+        return False
+
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    temp_output = f"{output}.{os.getpid()}.tmp"
+    with open(source, "rb") as infile:
+        feature.generate_feature_file(infile, open(temp_output, "wb"))
+    os.replace(temp_output, output)
+
+    manifest.write_manifest(state_file, record, output)
+    return True
+
+
+def build_font(source, output, feature_file_name, state_file, cache_dir, formats=None):
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    previous_stamps = _directory_stamps(output_dir)
+    font_filenames = convert.convert_bdf_file(
+        source,
+        output,
+        feature_file_name,
+        manifest_file=state_file,
+        features=feature_cache.shared_cache(cache_dir),
+        formats=formats,
+    )
+    if not isinstance(font_filenames, list):
+        font_filenames = [font_filenames]
+
+    return any(
+        _output_stamp(filename) != previous_stamps.get(os.path.abspath(filename))
+        for filename in font_filenames
+    )
+
+
+def _path(base_dir, entry, key, required=True):
+    value = entry.get(key)
+    if value == None:
+        if required:
+            raise ManifestError(f"missing '{key}' in {entry}")
+        return None
+
+    return os.path.normpath(os.path.join(base_dir, value))
+
+
+def _formats(entry):
+    value = entry.get("formats")
+    if value == None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+
+    try:
+        return output_formats.parse_formats(value)
+    except (AttributeError, ValueError) as error:
+        raise ManifestError(f"bad 'formats' in {entry}: {error}") from None
+
+
+# Read a build manifest, and return a list of tasks.
+def read_manifest(manifest_file):
+    with open(manifest_file, "rb") as stream:
+        parsed = yaml.safe_load(stream) or {}
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    state_dir = _path(base_dir, parsed, "state_dir", required=False)
+    if state_dir == None:
+        state_dir = os.path.join(base_dir, ".bdf2ttf")
+    cache_dir = os.path.join(state_dir, "features")
+
+    tasks = []
+
+    for entry in parsed.get("features") or []:
+        source = _path(base_dir, entry, "source")
+        output = _path(base_dir, entry, "output")
+        state_file = _state_file(state_dir, os.path.relpath(output, base_dir))
+        tasks.append(Task(
+            output,
+            build_feature_file,
+            (source, output, state_file),
+        ))
+
+    generated = {task.output for task in tasks}
+
+    for entry in parsed.get("fonts") or []:
+        source = _path(base_dir, entry, "source")
+        output = _path(base_dir, entry, "output")
+        feature_file_name = _path(base_dir, entry, "feature_file", required=False)
+        formats = _formats(entry)
+
+        dependencies = []
+        if feature_file_name in generated:
+            dependencies.append(feature_file_name)
+
+        state_file = _state_file(state_dir, os.path.relpath(output, base_dir))
+        tasks.append(Task(
+            output,
+            build_font,
+            (source, output, feature_file_name, state_file, cache_dir, formats),
+            dependencies,
+        ))
+
+    outputs = [task.output for task in tasks]
+    duplicates = {output for output in outputs if outputs.count(output) > 1}
+    if duplicates:
+        raise ManifestError(f"outputs listed more than once: {', '.join(sorted(duplicates))}")
+
+    return tasks
+
+
+# Run the tasks, starting each one as soon as its dependencies are done.
+# Returns a dictionary mapping each output to (status, error), where status is
+# "built", "up to date", "failed" or "skipped".
+def run_tasks(tasks, jobs=None):
+    results = {}
+    pending = {task.output: task for task in tasks}
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for output, task in list(pending.items()):
+                if any(dependency not in results for dependency in task.dependencies):
+                    continue
+
+                del pending[output]
+                if any(results[dependency][0] in ("failed", "skipped") for dependency in task.dependencies):
+                    results[output] = ("skipped", "a dependency failed")
+                else:
+                    running[pool.submit(task.function, *task.args)] = output
+
+            if not running:
+                if pending:
+                    raise ManifestError(f"unresolvable dependencies: {', '.join(sorted(pending))}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                output = running.pop(future)
+                try:
+                    built = future.result()
+                except Exception as error:
+                    results[output] = ("failed", batch.describe_error(error))
+                else:
+                    results[output] = ("built" if built else "up to date", None)
+
+    return results
+
+
+def print_summary(tasks, results, stream=sys.stderr):
+    counts = {}
+
+    for task in tasks:
+        status, error = results[task.output]
+        counts[status] = counts.get(status, 0) + 1
+
+        if error:
+            print(f"{status:<11} {task.output}: {error}", file=stream)
+        else:
+            print(f"{status:<11} {task.output}", file=stream)
+
+    statuses = ["built", "up to date", "failed", "skipped"]
+    print(", ".join(f"{counts.get(status, 0)} {status}" for status in statuses), file=stream)
+
+    return counts.get("failed", 0) + counts.get("skipped", 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bdf2ttf build",
+        description=__doc__.splitlines()[1],
+    )
+    parser.add_argument("manifest", help="""
+            The YAML manifest describing the fonts and feature files to build.
+            """)
+    parser.add_argument("-j", "--jobs", type=int, help="""
+            The number of outputs to build at once. Defaults to the number of
+            CPUs.
+            """)
+
+    args = parser.parse_args(argv)
+
+    try:
+        tasks = read_manifest(args.manifest)
+    except (OSError, ManifestError, yaml.YAMLError) as error:
+        parser.error(str(error))
+
+    results = run_tasks(tasks, jobs=args.jobs)
+
+    if print_summary(tasks, results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
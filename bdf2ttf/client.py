@@ -0,0 +1,157 @@
+"""
+Convert fonts using a running `bdf2ttf serve` daemon.
+
+This module only uses the standard library, so it starts quickly. The daemon
+does the conversion, with fontTools already imported and its caches warm.
+
+Messages are framed as a 4-byte big-endian length followed by the data. Each
+request is two frames: a JSON header, then the BDF data (empty if the header
+names a path instead). Each response is also two frames: a JSON header, then
+the TTF data (empty if the conversion failed).
+
+Request header fields:
+
+* ``path``: the BDF file to convert, if no BDF data is sent
+* ``feature_path``: an optional feature file
+* ``feature_text``: optional feature file contents, used instead of a path
+
+Response header fields:
+
+* ``ok``: whether the conversion succeeded
+* ``error``: a description of the failure, if it didn't
+"""
+
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+
+
+class ServerError(Exception):
+    pass
+
+
+def default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "bdf2ttf.sock")
+
+    return os.path.join(tempfile.gettempdir(), f"bdf2ttf-{os.getuid()}.sock")
+
+
+def send_frame(sock, data):
+    sock.sendall(struct.pack(">I", len(data)) + data)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            raise ConnectionError("connection closed in the middle of a message")
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b"".join(chunks)
+
+
+def recv_frame(sock):
+    (size,) = struct.unpack(">I", _recv_exactly(sock, 4))
+    return _recv_exactly(sock, size)
+
+
+# Ask the daemon to convert a font, and return the TTF data.
+# Either bdf_data or path must be given. Paths are read by the daemon, so they
+# should be absolute.
+def convert_remote(socket_path=None, bdf_data=None, path=None, feature_text=None, feature_path=None):
+    if socket_path == None:
+        socket_path = default_socket_path()
+
+    header = {}
+    if bdf_data == None:
+        header["path"] = path
+    if feature_text != None:
+        header["feature_text"] = feature_text
+    elif feature_path != None:
+        header["feature_path"] = feature_path
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_frame(sock, json.dumps(header).encode())
+        send_frame(sock, bdf_data or b"")
+
+        response = json.loads(recv_frame(sock))
+        font_data = recv_frame(sock)
+
+    if not response.get("ok"):
+        raise ServerError(response.get("error", "conversion failed"))
+
+    return font_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bdf2ttf client",
+        description=__doc__.splitlines()[1],
+    )
+    parser.add_argument("infile", help="""
+            The BDF font to convert. Use - to read from standard input.
+            """)
+    parser.add_argument("-o", "--out", help="""
+            The TTF font file to output. If not specified, the font is written
+            to standard output.
+            """)
+    parser.add_argument("-f", "--feature-file", help="""
+            Include feature information from an OpenType feature file in the
+            final font.
+            """)
+    parser.add_argument("-s", "--socket", default=default_socket_path(), help="""
+            The socket the daemon is listening on. Defaults to %(default)s.
+            """)
+    parser.add_argument("--send-paths", action="store_true", help="""
+            Send file paths instead of file contents. The daemon must be able
+            to read the files.
+            """)
+
+    args = parser.parse_args(argv)
+
+    bdf_data = None
+    path = None
+    feature_text = None
+    feature_path = None
+
+    if args.send_paths and args.infile != "-":
+        path = os.path.abspath(args.infile)
+        if args.feature_file:
+            feature_path = os.path.abspath(args.feature_file)
+    else:
+        if args.infile == "-":
+            bdf_data = sys.stdin.buffer.read()
+        else:
+            with open(args.infile, "rb") as infile:
+                bdf_data = infile.read()
+
+        if args.feature_file:
+            with open(args.feature_file, "r") as feature_file:
+                feature_text = feature_file.read()
+
+    try:
+        font_data = convert_remote(args.socket, bdf_data, path, feature_text, feature_path)
+    except (OSError, ServerError) as error:
+        print(f"{args.infile}: {error}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.out == None or args.out == "-":
+        sys.stdout.buffer.write(font_data)
+    else:
+        temp_filename = f"{args.out}.{os.getpid()}.tmp"
+        with open(temp_filename, "wb") as outfile:
+            outfile.write(font_data)
+        os.replace(temp_filename, args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Build the cmap table.
+
+- A format 4 subtable holds the Basic Multilingual Plane only, for older
+  software that reads nothing else. It is always there, even if it's empty.
+- If the font has characters beyond the BMP, a format 12 subtable holds the
+  whole repertoire.
+- A format 14 subtable holds Unicode variation sequences, if the font has
+  glyphs for any. These are unencoded glyphs named after the sequence, like
+  uni8FBB_uE0100 or u1F600_uFE0F.
+
+The subtables are compiled by fontTools when the font is saved, so a TTFont
+built here can still be edited or subset first.
+"""
+
+import struct
+
+from fontTools import agl
+from fontTools.ttLib import newTable
+from fontTools.ttLib.tables._c_m_a_p import CmapSubtable
+
+
+MAX_BMP = 0xFFFF
+
+
+def is_variation_selector(codepoint):
+    return (
+        0x180B <= codepoint <= 0x180F
+        or 0xFE00 <= codepoint <= 0xFE0F
+        or 0xE0100 <= codepoint <= 0xE01EF
+    )
+
+
+# Return the (codepoint, selector) sequence a glyph name stands for, or None
+# if it isn't the name of a variation sequence.
+def variation_sequence(name):
+    chars = agl.toUnicode(name)
+    if len(chars) != 2 or not is_variation_selector(ord(chars[1])):
+        return None
+
+    return (ord(chars[0]), ord(chars[1]))
+
+
+# Return (codepoint, selector, name) for every glyph in names that is named
+# after a variation sequence.
+def variation_sequences(names):
+    sequences = []
+    for name in names:
+        sequence = variation_sequence(name)
+        if sequence != None:
+            sequences.append((*sequence, name))
+
+    return sequences
+
+
+def _subtable(font, fmt, platform_id, encoding_id, char_map):
+    subtable = CmapSubtable.newSubtable(fmt)
+    subtable.platformID = platform_id
+    subtable.platEncID = encoding_id
+    subtable.language = 0
+    subtable.cmap = char_map
+    return subtable
+
+
+# Build a cmap table for font, whose glyph order must already be set.
+# char_map maps codepoints to glyph names. sequences is an optional list of
+# (codepoint, selector, name) variation sequences.
+def build_cmap(font, char_map, sequences=()):
+    bmp_map = {codepoint: name for codepoint, name in char_map.items() if codepoint <= MAX_BMP}
+
+    # Compiled once here, only to report a font with too many segments
+    # before it is saved
+    bmp = _subtable(font, 4, 3, 1, bmp_map)
+    try:
+        bmp.compile(font)
+    except struct.error:
+        raise ValueError("too many cmap segments for format 4; try --optimize-order") from None
+
+    # Both format 4 subtables share one dict, so they share their data in the
+    # compiled table
+    subtables = [_subtable(font, 4, 0, 3, bmp_map), bmp]
+
+    if len(bmp_map) < len(char_map):
+        subtables.append(_subtable(font, 12, 3, 10, char_map))
+
+    if sequences:
+        uvs = _subtable(font, 14, 0, 5, {})
+        uvs.uvsDict = {}
+        for codepoint, selector, name in sequences:
+            uvs.uvsDict.setdefault(selector, []).append((codepoint, name))
+        subtables.append(uvs)
+
+    cmap = newTable("cmap")
+    cmap.tableVersion = 0
+    cmap.tables = subtables
+    return cmap
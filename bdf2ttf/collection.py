@@ -0,0 +1,273 @@
+"""
+Convert a family of bitmap fonts into one TrueType Collection.
+
+Every member is converted on its own, in parallel. The members are then merged
+into a single glyph order: glyphs with the same outline and advance are stored
+once, whichever member they came from. Each member gets its own cmap and
+layout tables pointing into that shared order, so the glyf, loca, hmtx and
+maxp tables are identical in every member and stored only once in the .ttc.
+Any other table that comes out identical, like a GSUB compiled from a shared
+feature file for members with the same glyphs, is shared too.
+"""
+
+import argparse
+import io
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from fontTools.ttLib import TTCollection, TTFont, newTable
+
+from bdf2ttf import batch, convert, device_metrics, feature_cache
+
+
+# Tables that don't refer to glyphs, and are copied into each member as they
+# are.
+PLAIN_TABLES = ("head", "hhea", "OS/2", "name", "gasp", "VDMX")
+
+# Tables that refer to glyphs by ID, and are rewritten for the shared order.
+LAYOUT_TABLES = feature_cache.LAYOUT_TABLES
+
+# Tables rebuilt from the shared glyphs.
+SHARED_TABLES = ("glyf", "loca", "hmtx", "maxp", "hdmx", "LTSH")
+
+MAX_GLYPHS = 0xFFFF
+
+
+# Runs in a worker process. Returns the TTF data of one member.
+def build_member(infile, feature_file_name=None, cache_dir=None):
+    with open(infile, "rb") as stream:
+        if feature_file_name == None:
+            _, tt_font = convert.build_opentype(stream)
+        else:
+            with open(feature_file_name, "r") as feature_file:
+                _, tt_font = convert.build_opentype(
+                    stream,
+                    feature_file,
+                    features=feature_cache.shared_cache(cache_dir),
+                )
+
+    return convert.font_bytes(tt_font)
+
+
+def build_members(infiles, feature_file_name=None, cache_dir=None, jobs=None):
+    if jobs == 1 or len(infiles) <= 1:
+        return [build_member(infile, feature_file_name, cache_dir) for infile in infiles]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(build_member, infile, feature_file_name, cache_dir)
+            for infile in infiles
+        ]
+        return [future.result() for future in futures]
+
+
+def _unique_name(name, member_index, used):
+    candidate = name
+    while candidate in used:
+        candidate = f"{name}.m{member_index}"
+        name = candidate
+
+    return candidate
+
+
+# Merge the glyphs of every member into one glyph order. Returns the shared
+# order, the shared glyphs and metrics, and for each member a list giving the
+# shared name of each of its glyphs, in its own glyph order.
+def merge_glyphs(members):
+    order = []
+    glyphs = {}
+    metrics = {}
+    by_key = {}
+
+    renames = []
+    for index, member in enumerate(members):
+        glyf = member["glyf"]
+        hmtx = member["hmtx"]
+
+        rename = []
+        for name in member.getGlyphOrder():
+            glyph = glyf[name]
+            key = (glyph.compile(glyf), hmtx[name])
+
+            # .notdef must stay first, so it is only ever merged with the
+            # .notdef of another member
+            if name == ".notdef":
+                key = (key, name)
+
+            shared_name = by_key.get(key)
+            if shared_name == None:
+                shared_name = _unique_name(name, index, glyphs)
+                by_key[key] = shared_name
+                order.append(shared_name)
+                glyphs[shared_name] = glyph
+                metrics[shared_name] = hmtx[name]
+
+            rename.append(shared_name)
+        renames.append(rename)
+
+    if len(order) > MAX_GLYPHS:
+        raise ValueError(f"the family has {len(order)} distinct glyphs, more than a font can hold")
+
+    return order, glyphs, metrics, renames
+
+
+# Load a table of member with every glyph given its shared name. The table
+# data keeps the member's glyph IDs; decompiling it against a font whose glyph
+# order holds the shared names turns those IDs into the shared names.
+def _renamed_table(member, tag, rename):
+    renamed = TTFont()
+    renamed.setGlyphOrder(rename)
+
+    table = newTable(tag)
+    table.decompile(member.getTableData(tag), renamed)
+    return table
+
+
+def build_member_font(member, rename, order, glyphs, metrics):
+    unknown = set(member.keys()) - {"GlyphOrder", "cmap", "post"} - set(
+        PLAIN_TABLES + LAYOUT_TABLES + SHARED_TABLES
+    )
+    if unknown:
+        raise ValueError(f"can't share tables in a collection: {', '.join(sorted(unknown))}")
+
+    names = dict(zip(member.getGlyphOrder(), rename))
+
+    font = TTFont()
+    font.setGlyphOrder(order)
+
+    for tag in PLAIN_TABLES:
+        if tag in member:
+            font[tag] = member[tag]
+
+    for tag in LAYOUT_TABLES:
+        if tag in member:
+            font[tag] = _renamed_table(member, tag, rename)
+
+    cmap = member["cmap"]
+    for subtable in cmap.tables:
+        subtable.cmap = {codepoint: names[name] for codepoint, name in subtable.cmap.items()}
+        if subtable.format == 14:
+            subtable.uvsDict = {
+                selector: [
+                    (codepoint, names[name] if name != None else None)
+                    for codepoint, name in sequences
+                ]
+                for selector, sequences in subtable.uvsDict.items()
+            }
+    font["cmap"] = cmap
+
+    # Compiled from the shared glyph order
+    font["post"] = member["post"]
+
+    glyf = newTable("glyf")
+    glyf.glyphOrder = order
+    glyf.glyphs = glyphs
+    font["glyf"] = glyf
+    font["loca"] = newTable("loca")
+
+    hmtx = newTable("hmtx")
+    hmtx.metrics = metrics
+    font["hmtx"] = hmtx
+
+    font["maxp"] = member["maxp"]
+
+    # Device metrics for every shared glyph, at the member's sizes
+    if "hdmx" in member:
+        font["hdmx"] = device_metrics.hdmx_table(font, sorted(member["hdmx"].hdmx))
+    if "LTSH" in member:
+        font["LTSH"] = device_metrics.ltsh_table(font)
+
+    return font
+
+
+# Convert infiles into one collection, written to outfile. Returns a dict with
+# the size of the collection and of the separate fonts, and the number of
+# glyphs before and after merging.
+def build_collection(infiles, outfile, feature_file_name=None, cache_dir=None, jobs=None):
+    with convert.stage("members"):
+        members_data = build_members(infiles, feature_file_name, cache_dir, jobs)
+
+    with convert.stage("merge"):
+        members = [TTFont(io.BytesIO(data)) for data in members_data]
+        order, glyphs, metrics, renames = merge_glyphs(members)
+
+        collection = TTCollection()
+        collection.fonts = [
+            build_member_font(member, rename, order, glyphs, metrics)
+            for member, rename in zip(members, renames)
+        ]
+
+    with convert.stage("write collection"):
+        stream = io.BytesIO()
+        collection.save(stream, shareTables=True)
+        data = stream.getvalue()
+        convert.write_atomic(data, outfile)
+
+    return {
+        "fonts": len(members),
+        "size": len(data),
+        "separate_size": sum(map(len, members_data)),
+        "glyphs": len(order),
+        "separate_glyphs": sum(map(len, renames)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bdf2ttf collection",
+        description=__doc__.splitlines()[1],
+    )
+    parser.add_argument("infile", nargs="+", help="""
+            The BDF fonts to include, in order. Directories and glob patterns
+            are expanded.
+            """)
+    parser.add_argument("-o", "--out", required=True, help="""
+            The .ttc file to write.
+            """)
+    parser.add_argument("-f", "--feature-file", help="""
+            Include feature information from an OpenType feature file in
+            every member.
+            """)
+    parser.add_argument("-j", "--jobs", type=int, help="""
+            The number of fonts to convert at once. Defaults to the number of
+            CPUs.
+            """)
+    parser.add_argument("--feature-cache", help="""
+            A directory for caching compiled OpenType features.
+            """)
+    parser.add_argument("-v", "--verbose", action="store_true", help="""
+            Report how long each stage takes.
+            """)
+
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        convert.log_stages()
+
+    infiles = batch.expand_inputs(args.infile)
+    if not infiles:
+        parser.error("no input fonts")
+
+    try:
+        summary = build_collection(
+            infiles,
+            args.out,
+            feature_file_name=args.feature_file,
+            cache_dir=args.feature_cache,
+            jobs=args.jobs,
+        )
+    except Exception as error:
+        print(f"{args.out}: {batch.describe_error(error)}", file=sys.stderr)
+        sys.exit(1)
+
+    print(
+        f"wrote {args.out}: {summary['fonts']} fonts, {summary['size']} bytes "
+        f"({summary['separate_size']} as separate fonts), {summary['glyphs']} glyphs "
+        f"({summary['separate_glyphs']} as separate fonts)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,17 @@
 """Convert bitmap fonts into TTF format."""
 
 import argparse
+import io
+import json
+import logging
+import os
 import re
 import sys
 import time
 
-from collections import OrderedDict
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import IntEnum
 
 import bdflib.model
@@ -13,8 +19,36 @@ import bdflib.reader
 
 from fontTools.fontBuilder import FontBuilder
 from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib.tables._g_l_y_f import Glyph
 from fontTools.ttLib.removeOverlaps import removeOverlaps
-from fontTools.feaLib.builder import addOpenTypeFeatures
+
+from bdf2ttf import (
+    bitmaps, cmap, device_metrics, feature_cache, formats as output_formats, manifest, subset,
+)
+
+
+# Named explicitly, since this module also runs as __main__.
+log = logging.getLogger("bdf2ttf")
+
+# The most glyphs one font can hold
+MAX_GLYPHS = 0xFFFF
+
+
+# Log how long a stage of the conversion takes. Shown with --verbose.
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    yield
+    log.info("%s: %.3fs", name, time.perf_counter() - start)
+
+
+# Print stage timings to standard error. Only our own messages are shown;
+# fontTools logs a lot at INFO level.
+def log_stages():
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
 
 
 class NameID(IntEnum):
@@ -29,10 +63,40 @@ class NameID(IntEnum):
 
 
 class Font:
-    def __init__(self, bdf_font: bdflib.model.Font):
+    # If header_only is set, only the font-wide sizes and attributes are
+    # calculated. No glyphs are built, so the font can't be converted.
+    #
+    # outline_cache is an optional dict-like object, which maps glyph bitmaps
+    # to finished glyph outlines. It can be shared between fonts, or between
+    # repeated conversions of the same font.
+    #
+    # device_ppems lists the sizes to build hdmx, LTSH and VDMX tables for, as
+    # returned by device_metrics.parse_ppems. By default, the tables are left
+    # out.
+    #
+    # If optimize_order is set, glyphs are reordered to make the cmap and hmtx
+    # tables smaller, instead of keeping the order of the BDF file. If ranking
+    # (a list of codepoints, as returned by usage_ranking) is given, the glyphs
+    # for those codepoints are moved to the front, in that order.
+    def __init__(self, bdf_font: bdflib.model.Font, header_only=False, outline_cache=None,
+                 device_ppems=None, optimize_order=False, ranking=None):
+        self.outline_cache = outline_cache
+        self.device_ppems = device_ppems or []
+        self.outline_keys = {}
+        self.cached_names = set()
+        # The glyph order of the BDF file, if the glyphs have been reordered
+        self.file_order = None
+
         self.calculate_sizes(bdf_font)
         self.build_attributes(bdf_font)
-        self.build_glyphs(bdf_font)
+        if not header_only:
+            self.build_glyphs(bdf_font)
+            if optimize_order or ranking:
+                self.file_order = self.glyph_order()
+            if optimize_order:
+                self.optimize_glyph_order()
+            if ranking:
+                self.rank_glyph_order(ranking)
 
 
     def calculate_sizes(self, bdf_font) -> None:
@@ -294,8 +358,11 @@ class Font:
         return fields
 
 
+    # Collect the names, codepoints and advance widths of every glyph, and
+    # settle the glyph order. Outlines are traced later, by build_outlines.
     def build_glyphs(self, bdf_font):
         self.glyphs = OrderedDict()
+        self.bdf_glyphs = {}
 
         a_to_z_widths = 0
         a_to_z_count = 0
@@ -304,9 +371,9 @@ class Font:
             codepoint = bdf_glyph.codepoint
             name = bdf_glyph.name.decode()
             advance_width = bdf_glyph.advance * self.pixel_size
-            glyph = self.build_tt_glyph(bdf_glyph)
 
-            self.glyphs[name] = (glyph, codepoint, advance_width)
+            self.glyphs[name] = (None, codepoint, advance_width)
+            self.bdf_glyphs[name] = bdf_glyph
 
             if ord("A") <= codepoint <= ord("Z"):
                 a_to_z_widths += advance_width
@@ -332,6 +399,83 @@ class Font:
         # TODO: handle other special glyphs: .null, CR, space?
 
 
+    def glyph_order(self):
+        return list(self.glyphs.keys())
+
+
+    # Sort the encoded glyphs by codepoint, so runs of codepoints map to runs
+    # of glyph IDs and cmap needs few segments. In a monospaced font, the
+    # glyphs with the most common advance also go last: hmtx stores only the
+    # first advance of the final run of equal advances. Unencoded glyphs
+    # follow the encoded ones of the same group, in file order.
+    def optimize_glyph_order(self):
+        common_advance = None
+        if self.is_monospace:
+            advances = Counter(advance for _, _, advance in self.glyphs.values())
+            common_advance = advances.most_common(1)[0][0]
+
+        def sort_key(name):
+            _, codepoint, advance_width = self.glyphs[name]
+            return (name != ".notdef", advance_width == common_advance, codepoint < 0, codepoint)
+
+        order = sorted(self.glyphs, key=sort_key)
+        self.glyphs = OrderedDict((name, self.glyphs[name]) for name in order)
+
+
+    # Move the glyphs for the codepoints in ranking to the front, right after
+    # .notdef, in ranking order. The glyphs most text needs then sit together
+    # at the start of glyf and loca, which suits memory-mapped loading and
+    # range requests. Other glyphs keep their order.
+    def rank_glyph_order(self, ranking):
+        ranks = {}
+        for rank, codepoint in enumerate(ranking):
+            ranks.setdefault(codepoint, rank)
+
+        def sort_key(name):
+            codepoint = self.glyphs[name][1]
+            return (name != ".notdef", ranks.get(codepoint, len(ranks)))
+
+        order = sorted(self.glyphs, key=sort_key)
+        self.glyphs = OrderedDict((name, self.glyphs[name]) for name in order)
+
+        ranked = sum(1 for _, codepoint, _ in self.glyphs.values() if codepoint in ranks)
+        log.info("glyph order: %d glyphs ranked by usage", ranked)
+
+
+    def build_outlines(self):
+        for name, (glyph, codepoint, advance_width) in self.glyphs.items():
+            if glyph is None:
+                glyph = self.cached_tt_glyph(name, self.bdf_glyphs[name])
+                self.glyphs[name] = (glyph, codepoint, advance_width)
+
+
+    # Outlines are cached after overlap removal, so a glyph whose bitmap hasn't
+    # changed never needs to be traced or merged again.
+    def cached_tt_glyph(self, name, bdf_glyph):
+        if self.outline_cache is None:
+            return self.build_tt_glyph(bdf_glyph)
+
+        key = (
+            self.pixel_size,
+            bdf_glyph.bbX,
+            bdf_glyph.bbY,
+            bdf_glyph.bbW,
+            bdf_glyph.bbH,
+            tuple(bdf_glyph.data),
+        )
+        self.outline_keys[name] = key
+
+        data = self.outline_cache.get(key)
+        if data is None:
+            return self.build_tt_glyph(bdf_glyph)
+
+        self.cached_names.add(name)
+        glyph = Glyph(data)
+        glyph.expand(None)
+
+        return glyph
+
+
     def build_tt_glyph(self, bdf_glyph):
         pen = TTGlyphPen(None)
 
@@ -381,21 +525,38 @@ class Font:
 
 
     def opentype_font(self):
+        if len(self.glyphs) > MAX_GLYPHS:
+            raise ValueError(
+                f"the font has {len(self.glyphs)} glyphs, more than one font can hold; "
+                "convert it from a file to split it automatically"
+            )
+
+        with stage("outlines"):
+            self.build_outlines()
+
         fb = FontBuilder(unitsPerEm=self.em_size)
 
-        glyph_order = list(self.glyphs.keys())
+        glyph_order = self.glyph_order()
         fb.setupGlyphOrder(glyph_order)
 
         char_map = dict()
         glyph_map = dict()
+        unencoded = []
         for name, glyph_tuple in self.glyphs.items():
             glyph, codepoint, _ = glyph_tuple
 
             glyph_map[name] = glyph
             if codepoint >= 0:
                 char_map[codepoint] = name
+            else:
+                unencoded.append(name)
+
+        with stage("cmap"):
+            sequences = cmap.variation_sequences(unencoded)
+            fb.font["cmap"] = cmap.build_cmap(fb.font, char_map, sequences)
+        if log.isEnabledFor(logging.INFO):
+            log.info("cmap size: %d bytes", len(fb.font["cmap"].compile(fb.font)))
 
-        fb.setupCharacterMap(char_map)
         fb.setupGlyf(glyph_map)
 
         metrics = {}
@@ -405,6 +566,14 @@ class Font:
             metrics[name] = (advance_width, glyf_table[name].xMin)
         fb.setupHorizontalMetrics(metrics)
 
+        # Only measured when it will be reported, since cmap is compiled twice
+        if self.file_order != None and log.isEnabledFor(logging.INFO):
+            log.info(
+                "glyph order: cmap and hmtx take %d bytes (%d in file order)",
+                order_size(glyph_order, char_map, metrics),
+                order_size(self.file_order, char_map, metrics),
+            )
+
         font_ascent = self.ascent * self.pixel_size
         font_descent = -self.descent * self.pixel_size # specified as a negative value
         line_gap = 0
@@ -475,20 +644,298 @@ class Font:
         )
 
         # Merge adjacent pixel squares and reduce extra points
-        removeOverlaps(fb.font)
+        with stage("remove overlaps"):
+            if self.outline_cache is None:
+                removeOverlaps(fb.font)
+            else:
+                new_names = [name for name in glyph_order if name not in self.cached_names]
+                removeOverlaps(fb.font, glyphNames=new_names)
+
+                for name, key in self.outline_keys.items():
+                    if name not in self.cached_names:
+                        self.outline_cache[key] = glyf_table[name].compile(glyf_table)
+
+        # Exact advances and heights for the sizes the font is used at
+        device_metrics.add_device_metrics(
+            fb.font,
+            device_metrics.resolve_ppems(self.device_ppems, self.font_size),
+        )
 
         return fb
 
 
-def convert_bdf(infile, outfile=None, feature_file=None):
-    bdf = bdflib.reader.read_bdf(infile)
+# Rank the characters of text by how often they appear, most frequent first,
+# and return their codepoints. Ties keep the order of first appearance, so a
+# list of characters that is already ranked works as well as a corpus.
+# Whitespace is ignored.
+def usage_ranking(text):
+    counts = Counter(char for char in text if not char.isspace())
+    return [ord(char) for char, _ in counts.most_common()]
+
+
+# Return the size in bytes of the cmap and hmtx tables for a glyph order.
+def order_size(glyph_order, char_map, metrics):
+    fb = FontBuilder(unitsPerEm=1024)
+    fb.setupGlyphOrder(glyph_order)
+    cmap_size = len(cmap.build_cmap(fb.font, char_map).compile(fb.font))
+
+    # hmtx leaves out the advances of the final run of equal advances,
+    # except the first
+    advances = [metrics[name][0] for name in glyph_order]
+    long_metrics = len(advances)
+    while long_metrics > 1 and advances[long_metrics - 2] == advances[-1]:
+        long_metrics -= 1
+
+    return cmap_size + 4 * long_metrics + 2 * (len(advances) - long_metrics)
+
+
+# Yield the lines of a BDF file up to the glyph count, then end the font
+# there. This lets bdflib parse the header without reading any glyphs.
+# The glyph count is stored in counts["glyphs"].
+def header_lines(lines, counts):
+    for line in lines:
+        fields = line.split()
+        if fields and fields[0] == b"CHARS":
+            counts["glyphs"] = int(fields[1])
+            yield b"CHARS 0\n"
+            yield b"ENDFONT\n"
+            return
+
+        yield line
+
+
+# Read only the header of a BDF file, and return a dictionary describing the
+# font. Glyphs are never parsed or outlined.
+def font_info(infile):
+    counts = {"glyphs": 0}
+    bdf = bdflib.reader.read_bdf(header_lines(infile, counts))
+
+    font = Font(bdf, header_only=True)
+
+    return {
+        "family": font.family,
+        "style": font.style,
+        "human_name": font.human_name,
+        "postscript_name": font.postscript_name,
+        "weight": font.weight_value,
+        "weight_name": font.weight_name,
+        "is_bold": font.is_bold,
+        "is_italic": font.is_italic,
+        "is_monospace": font.is_monospace,
+        "version": font.version,
+        "copyright": font.copyright,
+        "font_size": font.font_size,
+        "ascent": font.ascent,
+        "descent": font.descent,
+        "x_height": font.x_height,
+        "cap_height": font.cap_height,
+        "glyph_count": counts["glyphs"],
+    }
+
+
+# Read a BDF font from infile (an iterable of lines), and return the Font
+# and the finished TTFont. Nothing is written to disk.
+#
+# If glyph_filter (a bdf2ttf.subset.GlyphFilter) is given, only the glyphs it
+# keeps are read, along with any glyph the feature file refers to.
+#
+# If bitmap_strikes is given, the bitmaps are embedded as EBDT and EBLC strikes,
+# one for this font and one for each BDF file named in bitmap_strikes, which
+# hold the same family at other pixel sizes.
+#
+# post_format 3 leaves the glyph names out of the final font. Feature files
+# can still use them, since features are compiled first. optimize_order and
+# ranking are passed on to Font. Features are compiled against the final glyph
+# order, so reordering never breaks them.
+def build_opentype(infile, feature_file=None, features=None, outline_cache=None,
+                   glyph_filter=None, device_ppems=None, bitmap_strikes=None, post_format=2,
+                   optimize_order=False, ranking=None):
+    if glyph_filter != None:
+        if feature_file != None:
+            glyph_filter = glyph_filter.with_feature_file(feature_file)
+        infile = subset.subset_lines(infile, glyph_filter)
+
+    with stage("parse"):
+        bdf = bdflib.reader.read_bdf(infile)
+        font = Font(bdf, outline_cache=outline_cache, device_ppems=device_ppems,
+                    optimize_order=optimize_order, ranking=ranking)
+
+    if feature_file == None:
+        tt_font = font.opentype_font().font
+    else:
+        if features == None:
+            features = feature_cache.default_cache
+
+        # Features only need the glyph order, so compile them on another thread
+        # while the outlines are traced and merged, and attach them at the end.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            compiled = pool.submit(_compile_features, features, feature_file, font.glyph_order())
+            tt_font = font.opentype_font().font
+
+            compiled = compiled.result()
+
+        feature_cache.apply_features(tt_font, compiled)
+
+    if bitmap_strikes != None:
+        with stage("bitmaps"):
+            strike_fonts = [font] + [
+                read_strike(filename, glyph_filter) for filename in bitmap_strikes
+            ]
+            bitmaps.add_bitmap_strikes(tt_font, font, strike_fonts)
+
+    # Everything that refers to glyphs by name has been compiled to glyph IDs
+    # by now, so the names can go.
+    if post_format == 3:
+        tt_font["post"].formatType = 3.0
 
-    font = Font(bdf)
+    return font, tt_font
 
-    font_builder = font.opentype_font()
 
-    if feature_file != None:
-        addOpenTypeFeatures(font_builder.font, feature_file)
+# Read a BDF file holding extra bitmap sizes for a font. Its glyphs are read,
+# but never outlined.
+def read_strike(filename, glyph_filter=None):
+    with open(filename, "rb") as stream:
+        lines = stream
+        if glyph_filter != None:
+            lines = subset.subset_lines(stream, glyph_filter)
+
+        return Font(bdflib.reader.read_bdf(lines))
+
+
+def _compile_features(features, feature_file, glyph_order):
+    with stage("features"):
+        return features.compile(feature_file, glyph_order)
+
+
+# Convert a BDF font in memory, and return a TTFont.
+# bdf_data can be bytes or a binary file object. feature_text is optional, and
+# can be a string or a text file object.
+def convert_to_ttfont(bdf_data, feature_text=None, **options):
+    if isinstance(bdf_data, (bytes, bytearray)):
+        bdf_data = io.BytesIO(bdf_data)
+    if isinstance(feature_text, str):
+        feature_text = io.StringIO(feature_text)
+
+    _, tt_font = build_opentype(bdf_data, feature_text, **options)
+    return tt_font
+
+
+# Same as convert_to_ttfont, but returns the binary TTF data.
+def convert_to_bytes(bdf_data, feature_text=None, **options):
+    return font_bytes(convert_to_ttfont(bdf_data, feature_text, **options))
+
+
+def font_bytes(tt_font):
+    stream = io.BytesIO()
+    tt_font.save(stream)
+    return stream.getvalue()
+
+
+# Write to a temporary file next to the final one, then rename it, so readers
+# never see a partially written font.
+def save_atomic(font, filename):
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        font.save(temp_filename)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+# Same as save_atomic, for font data that has already been serialized.
+def write_atomic(data, filename):
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_filename, "wb") as stream:
+            stream.write(data)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+def _serialize(fmt, ttf_data, options):
+    with stage(f"write {fmt}"):
+        data = output_formats.SERIALIZERS[fmt](ttf_data, **options.get(fmt, {}))
+
+    log.info("%s size: %d bytes", fmt, len(data))
+    return data
+
+
+# Serialize a finished TTFont in each of formats, and return a list of the
+# data. The TrueType data is compiled once, and every other format is derived
+# from it on its own thread. options maps formats to keyword arguments for
+# their serializers in bdf2ttf.formats.
+def serialize_formats(tt_font, formats, options=None):
+    options = options or {}
+
+    with stage("compile"):
+        ttf_data = font_bytes(tt_font)
+
+    if len(formats) == 1:
+        return [_serialize(formats[0], ttf_data, options)]
+
+    with ThreadPoolExecutor(max_workers=len(formats)) as pool:
+        futures = [pool.submit(_serialize, fmt, ttf_data, options) for fmt in formats]
+        return [future.result() for future in futures]
+
+
+# Convert a BDF font, and return the name of the font file written.
+#
+# formats is an optional list of output formats (see bdf2ttf.formats). The
+# font is parsed and outlined once, then written once per format, and a list
+# of the file names written is returned. format_options is passed on to
+# serialize_formats.
+def convert_bdf(infile, outfile=None, feature_file=None, manifest_file=None, features=None,
+                outline_cache=None, formats=None, format_options=None, glyph_filter=None,
+                device_ppems=None, bitmap_strikes=None, post_format=2, optimize_order=False,
+                ranking=None):
+    record = None
+    if manifest_file != None:
+        options = {
+            "outfile": outfile,
+        }
+        if formats != None:
+            options["formats"] = list(formats)
+        if format_options:
+            options["format_options"] = format_options
+        if glyph_filter != None:
+            options["glyph_filter"] = glyph_filter.describe()
+        if device_ppems != None:
+            options["device_ppems"] = device_ppems
+        if bitmap_strikes != None:
+            options["bitmap_strikes"] = [
+                [filename, manifest.hash_file(filename)] for filename in bitmap_strikes
+            ]
+        if post_format != 2:
+            options["post_format"] = post_format
+        if optimize_order:
+            options["optimize_order"] = True
+        if ranking:
+            options["ranking"] = manifest.hash_value(list(ranking))
+        record = manifest.fingerprint(infile, feature_file, options)
+
+        # Nothing has changed since the last conversion, so skip all parsing.
+        font_filename = manifest.up_to_date(manifest_file, record, all_outputs=formats != None)
+        if font_filename:
+            return font_filename
+
+    font, tt_font = build_opentype(infile, feature_file, features, outline_cache, glyph_filter,
+                                   device_ppems, bitmap_strikes, post_format, optimize_order,
+                                   ranking)
+
+    if formats != None:
+        return _write_formats(font, tt_font, outfile, formats, format_options, manifest_file,
+                              record)
+
+    if outfile == "-":
+        # Stream the final font to standard output
+        sys.stdout.buffer.write(font_bytes(tt_font))
+        sys.stdout.buffer.flush()
+        return outfile
 
     if outfile != None:
         font_filename = outfile
@@ -496,26 +943,426 @@ def convert_bdf(infile, outfile=None, feature_file=None):
         font_filename = f"{font.postscript_name}.ttf"
 
     # Output the final font
-    font_builder.save(font_filename)
+    save_atomic(tt_font, font_filename)
+
+    if manifest_file != None:
+        manifest.write_manifest(manifest_file, record, font_filename)
+
+    return font_filename
+
 
+def _write_formats(font, tt_font, outfile, formats, format_options, manifest_file, record):
+    datas = serialize_formats(tt_font, formats, format_options)
+
+    if outfile == "-":
+        # Only a single format can be streamed
+        sys.stdout.buffer.write(datas[0])
+        sys.stdout.buffer.flush()
+        return [outfile]
+
+    font_filenames = output_formats.output_filenames(outfile, font.postscript_name, formats)
+    for data, font_filename in zip(datas, font_filenames):
+        write_atomic(data, font_filename)
+
+    if manifest_file != None:
+        manifest.write_manifest(manifest_file, record, font_filenames)
+
+    return font_filenames
+
+
+# Same as convert_bdf, but takes file names instead of file objects.
+#
+# Fonts with more glyphs than one font can hold are split into several fonts
+# by bdf2ttf.split, and a list of the files written is returned.
+def convert_bdf_file(infile_name, outfile=None, feature_file_name=None, **options):
+    with open(infile_name, "rb") as infile:
+        glyph_count = font_info(infile)["glyph_count"]
+        if options.get("glyph_filter") == None and glyph_count + 1 > MAX_GLYPHS:
+            return _split_file(infile_name, outfile, feature_file_name, **options)
+        infile.seek(0)
+
+        if feature_file_name == None:
+            return convert_bdf(infile, outfile, **options)
+
+        with open(feature_file_name, "r") as feature_file:
+            return convert_bdf(infile, outfile, feature_file, **options)
+
+
+def _split_file(infile_name, outfile, feature_file_name, manifest_file=None, features=None,
+                outline_cache=None, glyph_filter=None, **options):
+    # Imported here, because it imports this module
+    from bdf2ttf import split
+
+    if outfile == "-":
+        raise ValueError("the font has to be split, so it can't be written to standard output")
+    if manifest_file != None:
+        log.info("%s is split into several fonts, so no manifest is written", infile_name)
+
+    return split.split_font(infile_name, outfile, feature_file_name, max_glyphs=MAX_GLYPHS,
+                            **options)
+
+
+def _file_stamp(filename):
+    if filename == None:
+        return None
+
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# Convert the font, then convert it again whenever the BDF or feature file
+# changes. Files are polled with os.stat(), which is cheap enough to do a few
+# times a second. Feature tables and glyph outlines are kept in memory between
+# conversions, so only glyphs with changed bitmaps are traced again. At most
+# outline_cache_size outlines are kept, so a long editing session doesn't keep
+# every bitmap it has ever seen. Other options are passed on to
+# convert_bdf_file.
+def watch_bdf(infile_name, outfile=None, feature_file_name=None, interval=0.25, cache_dir=None,
+              outline_cache_size=65536, **options):
+    # Imported here, because converter imports this module
+    from bdf2ttf.converter import LRUCache
+
+    features = feature_cache.FeatureCache(cache_dir=cache_dir)
+    outline_cache = LRUCache(outline_cache_size)
+    last_stamp = None
+
+    try:
+        while True:
+            stamp = (_file_stamp(infile_name), _file_stamp(feature_file_name))
+
+            if stamp != last_stamp and stamp[0] != None:
+                last_stamp = stamp
+                start = time.perf_counter()
+
+                try:
+                    font_filename = convert_bdf_file(infile_name, outfile, feature_file_name,
+                            features=features, outline_cache=outline_cache, **options)
+                except Exception as error:
+                    # The file may have been caught halfway through a save.
+                    # Keep watching; the next save will trigger another attempt.
+                    print(f"{infile_name}: conversion failed: {error}", file=sys.stderr)
+                else:
+                    elapsed = time.perf_counter() - start
+                    print(f"{infile_name}: wrote {font_filename} in {elapsed:.2f}s", file=sys.stderr)
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    # Imported here, because these modules import this one.
+    from bdf2ttf import batch, build, client, collection, index, server, shard
+
+    commands = {
+        "build": build.main,
+        "collection": collection.main,
+        "index": index.main,
+        "serve": server.main,
+        "shard": shard.main,
+        "client": client.main,
+    }
+
+    if argv == None:
+        argv = sys.argv[1:]
+
+    if argv[:1] and argv[0] in commands:
+        commands[argv[0]](argv[1:])
+        return
 
-def main():
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("infile", type=argparse.FileType("rb"), help="""
-            The bitmap font to convert. Must be either a BDF font file, or an
-            SFD file containing a bitmap font.
+    parser.add_argument("infile", nargs="+", help="""
+            The bitmap fonts to convert. Must be either BDF font files, or SFD
+            files containing a bitmap font. Directories are searched for BDF
+            files, and glob patterns are expanded. Use - to read a single font
+            from standard input.
             """)
     parser.add_argument("-o", "--out", help="""
             The TTF font file to output. If not specified, will be generated
-            based on the font name and weight.
+            based on the font name and weight. Use - to write the font to
+            standard output. Only allowed with a single input font.
+            """)
+    parser.add_argument("-F", "--format", action="append", help=f"""
+            The formats to write, separated by commas: any of
+            {", ".join(output_formats.FORMATS)}. May be given more than once.
+            The font is parsed and outlined once for all formats. With
+            --out, formats other than the one it names replace its
+            extension. Defaults to ttf.
+            """)
+    parser.add_argument("--cff-version", type=int, choices=(1, 2), default=1, help="""
+            The CFF version used for OTF output. Defaults to %(default)s.
+            """)
+    parser.add_argument("--no-subroutinize", action="store_true", help="""
+            Don't subroutinize CFF charstrings in OTF output. Subroutinizing
+            needs the cffsubr package.
+            """)
+    parser.add_argument("--woff-level", type=int, choices=range(10), default=9, metavar="LEVEL",
+            help="""
+            The zlib compression level for WOFF output, from 0 (none) to 9
+            (smallest). Defaults to %(default)s.
+            """)
+    parser.add_argument("--zopfli", action="store_true", help="""
+            Compress WOFF output with zopfli instead of zlib. Slower, but
+            smaller. Needs the zopfli package.
+            """)
+    parser.add_argument("--unicodes", help="""
+            Only convert glyphs for these codepoints, given as hex codepoints
+            and ranges like U+0020-007E,2500-257F. Glyphs the feature file
+            refers to are always kept. Can be combined with --text and
+            --glyphs.
+            """)
+    parser.add_argument("--text", help="""
+            Only convert glyphs for the characters in this text.
+            """)
+    parser.add_argument("--glyphs", help="""
+            Only convert glyphs with these names, separated by commas or
+            spaces.
+            """)
+    parser.add_argument("--device-metrics", metavar="PPEMS", help=f"""
+            The sizes to build hdmx, LTSH and VDMX tables for, separated by
+            commas. Sizes ending in x are multiples of the font's native
+            size, so {device_metrics.COMMON_PPEMS} covers the native size and
+            its first few multiples. By default, the tables are left out.
+            """)
+    parser.add_argument("--bitmaps", action="store_true", help="""
+            Embed the font's bitmaps as an EBDT/EBLC strike next to the
+            outlines, so the font is drawn from its bitmaps at its native
+            size.
+            """)
+    parser.add_argument("--bitmap-strike", action="append", metavar="BDF", help="""
+            Also embed the bitmaps of another BDF font in the same family,
+            at a different pixel size. Glyphs are matched by name, or by
+            codepoint. Can be given more than once, and implies --bitmaps.
+            """)
+    parser.add_argument("--post-format", type=int, choices=(2, 3), default=2, help="""
+            The format of the post table. Format 2 keeps the glyph names
+            from the BDF; format 3 leaves them out, which makes large fonts
+            much smaller and quicker to load. Feature files can use the
+            glyph names either way.
+            """)
+    parser.add_argument("--optimize-order", action="store_true", help="""
+            Reorder the glyphs to make the font smaller: by codepoint, and
+            in monospaced fonts with the most common width last. With
+            --verbose, the number of bytes saved is reported.
+            """)
+    parser.add_argument("--ranking", help="""
+            A UTF-8 text file: either a sample of text, or a list of
+            characters from most to least frequent. Glyphs are ordered by
+            how often their characters appear in it, so the most used
+            glyphs come first in the font. Whitespace is ignored.
+            """)
+    parser.add_argument("-d", "--out-dir", help="""
+            Write each converted font into this directory, named after its
+            input file.
+            """)
+    parser.add_argument("-j", "--jobs", type=int, help="""
+            The number of fonts to convert at once. Defaults to the number of
+            CPUs.
             """)
     parser.add_argument("-f", "--feature-file", type=argparse.FileType("r"), help="""
             Include feature information from an OpenType feature file in the
             final font.
             """)
+    parser.add_argument("-m", "--manifest", help="""
+            A JSON file recording the inputs of the last conversion. If the
+            BDF, feature file, options and tool versions all match, and the
+            output file is unchanged, the conversion is skipped. The manifest
+            is updated after every conversion. With several input fonts, this
+            is a directory holding one manifest per font.
+            """)
+    parser.add_argument("--feature-cache", help="""
+            A directory for caching compiled OpenType features. Fonts with
+            the same feature file and glyph order reuse the cached tables
+            instead of compiling the feature file again.
+            """)
+    parser.add_argument("--info", action="store_true", help="""
+            Don't convert anything. Read only the font header, and print the
+            font's names, style, size and glyph count as JSON.
+            """)
+    parser.add_argument("-v", "--verbose", action="store_true", help="""
+            Report how long each stage of the conversion takes.
+            """)
+    parser.add_argument("-w", "--watch", action="store_true", help="""
+            Keep running, and convert the font again every time the BDF or
+            feature file is saved. Unchanged glyphs are not traced again.
+            """)
 
-    args = parser.parse_args()
-    convert_bdf(args.infile, outfile=args.out, feature_file=args.feature_file)
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        log_stages()
+
+    infiles = batch.expand_inputs(args.infile)
+    single_input = len(args.infile) == 1 and infiles == args.infile
+
+    if not infiles:
+        parser.error(f"no BDF fonts found in: {' '.join(args.infile)}")
+    missing = [infile for infile in infiles if infile != "-" and not os.path.exists(infile)]
+    if missing:
+        parser.error(f"can't open {', '.join(missing)}: no such file")
+    if "-" in infiles and len(infiles) > 1:
+        parser.error("standard input can only be used for a single font")
+    if args.out != None and not single_input:
+        parser.error("--out can only be used with a single input font")
+    if args.out != None and args.out_dir != None:
+        parser.error("--out and --out-dir can't be used together")
+    if args.out == "-" and args.manifest != None:
+        parser.error("--manifest can't be used when writing to standard output")
+    if args.out_dir != None and infiles == ["-"]:
+        parser.error("--out-dir needs input files, not standard input")
+    if args.watch and (not single_input or infiles == ["-"]):
+        parser.error("--watch needs a single input file")
+    if not single_input:
+        try:
+            batch.check_output_names(infiles, args.out_dir, args.manifest)
+        except ValueError as error:
+            parser.error(str(error))
+
+    formats = None
+    if args.format != None:
+        try:
+            formats = output_formats.parse_formats(args.format)
+        except ValueError as error:
+            parser.error(str(error))
+        if args.out == "-" and len(formats) > 1:
+            parser.error("only one format can be written to standard output")
+        if args.watch:
+            parser.error("--format can't be used with --watch")
+
+    glyph_filter = None
+    if args.unicodes != None or args.text != None or args.glyphs != None:
+        try:
+            glyph_filter = subset.GlyphFilter.from_options(args.unicodes, args.text, args.glyphs)
+        except ValueError as error:
+            parser.error(str(error))
+
+    device_ppems = None
+    if args.device_metrics != None:
+        try:
+            device_ppems = device_metrics.parse_ppems(args.device_metrics)
+        except ValueError as error:
+            parser.error(str(error))
+
+    bitmap_strikes = None
+    if args.bitmaps or args.bitmap_strike != None:
+        bitmap_strikes = args.bitmap_strike or []
+
+    ranking = None
+    if args.ranking != None:
+        with open(args.ranking, "r", encoding="utf-8") as ranking_file:
+            ranking = usage_ranking(ranking_file.read())
+
+    if args.zopfli and output_formats.zopfli_zlib == None:
+        parser.error("--zopfli needs the zopfli package; install bdf2ttf[zopfli]")
+
+    format_options = {}
+    if args.cff_version != 1 or args.no_subroutinize:
+        format_options["otf"] = {
+            "cff_version": args.cff_version,
+            "subroutinize": not args.no_subroutinize,
+        }
+    if args.woff_level != 9 or args.zopfli:
+        format_options["woff"] = {"level": args.woff_level, "zopfli": args.zopfli}
+
+    # Feature files are passed on by name, except one read from standard
+    # input, which is only read once.
+    feature_file_name = None
+    feature_text = None
+    if args.feature_file == sys.stdin:
+        if infiles == ["-"]:
+            parser.error("the font and the feature file can't both be read from standard input")
+        if not single_input or args.watch:
+            parser.error("-f - can only be used to convert a single font")
+        feature_text = args.feature_file.read()
+    elif args.feature_file != None:
+        args.feature_file.close()
+        feature_file_name = args.feature_file.name
+
+    if args.info:
+        infos = []
+        for infile in infiles:
+            if infile == "-":
+                infos.append(font_info(sys.stdin.buffer))
+            else:
+                with open(infile, "rb") as stream:
+                    infos.append(font_info(stream))
+
+        json.dump(infos[0] if single_input else infos, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+
+    if single_input:
+        outfile = args.out
+        if args.out_dir != None:
+            os.makedirs(args.out_dir, exist_ok=True)
+            outfile = batch.output_filename(infiles[0], args.out_dir)
+
+        options = {
+            "manifest_file": args.manifest,
+            "formats": formats,
+            "format_options": format_options,
+            "glyph_filter": glyph_filter,
+            "device_ppems": device_ppems,
+            "bitmap_strikes": bitmap_strikes,
+            "post_format": args.post_format,
+            "optimize_order": args.optimize_order,
+            "ranking": ranking,
+        }
+
+        if args.watch:
+            watch_bdf(
+                infiles[0],
+                outfile=outfile,
+                feature_file_name=feature_file_name,
+                cache_dir=args.feature_cache,
+                **options,
+            )
+            return
+
+        options["features"] = feature_cache.FeatureCache(cache_dir=args.feature_cache)
+
+        if infiles == ["-"]:
+            stdin = sys.stdin.buffer
+            # The manifest hashes the font before it is converted, so a pipe
+            # has to be read into memory first.
+            if args.manifest != None and not stdin.seekable():
+                stdin = io.BytesIO(stdin.read())
+
+            if feature_file_name == None:
+                convert_bdf(stdin, outfile, **options)
+            else:
+                with open(feature_file_name, "r") as feature_file:
+                    convert_bdf(stdin, outfile, feature_file, **options)
+        elif feature_text != None:
+            with open(infiles[0], "rb") as infile:
+                convert_bdf(infile, outfile, io.StringIO(feature_text), **options)
+        else:
+            convert_bdf_file(infiles[0], outfile, feature_file_name, **options)
+        return
+
+    results = batch.convert_many(
+        infiles,
+        out_dir=args.out_dir,
+        feature_file_name=feature_file_name,
+        manifest_dir=args.manifest,
+        cache_dir=args.feature_cache,
+        jobs=args.jobs,
+        formats=formats,
+        format_options=format_options,
+        glyph_filter=glyph_filter,
+        device_ppems=device_ppems,
+        bitmap_strikes=bitmap_strikes,
+        post_format=args.post_format,
+        optimize_order=args.optimize_order,
+        ranking=ranking,
+    )
+
+    if batch.print_summary(results):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
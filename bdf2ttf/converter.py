@@ -0,0 +1,201 @@
+"""
+A reusable converter for long-running processes.
+
+Each call to convert_bdf starts from nothing. A Converter keeps its caches and
+its worker pool between conversions, so a service converting many fonts only
+pays for imports, pool start-up and unchanged glyph outlines once.
+"""
+
+import os
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bdf2ttf import batch, convert, feature_cache
+
+
+# A dict-like mapping that forgets its least recently used entries once it
+# holds more than max_entries. Safe to share between threads.
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Caches used by conversions running in a worker process. Set up once per
+# process by _init_worker.
+_worker_caches = {}
+
+def _init_worker(outline_cache_size, feature_cache_dir):
+    _worker_caches["outlines"] = LRUCache(outline_cache_size)
+    _worker_caches["features"] = feature_cache.FeatureCache(cache_dir=feature_cache_dir)
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def _convert_in_worker(infile, outfile, feature_file_name):
+    return convert.convert_bdf_file(
+        infile,
+        outfile,
+        feature_file_name,
+        features=_worker_caches["features"],
+        outline_cache=_worker_caches["outlines"],
+    )
+
+
+def _convert_bytes_in_worker(bdf_data, feature_text):
+    return convert.convert_to_bytes(
+        bdf_data,
+        feature_text,
+        features=_worker_caches["features"],
+        outline_cache=_worker_caches["outlines"],
+    )
+
+
+class Converter:
+    # executor is either "thread" or "process". Threads share one set of
+    # caches; every worker process has its own.
+    #
+    # outline_cache_size is the number of glyph outlines kept in memory, per
+    # cache. feature_cache_dir is an optional directory for compiled features,
+    # shared by every cache.
+    def __init__(self, executor="thread", max_workers=None, outline_cache_size=65536,
+                 feature_cache_dir=None):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"unknown executor: {executor!r}")
+
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self.outlines = LRUCache(outline_cache_size)
+        self.features = feature_cache.FeatureCache(cache_dir=feature_cache_dir)
+
+        if executor == "process":
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(outline_cache_size, feature_cache_dir),
+            )
+            # Start every worker now, so the first conversions don't wait for
+            # processes to launch and import fontTools.
+            for future in [self.pool.submit(_worker_ready) for _ in range(self.max_workers)]:
+                future.result()
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def close(self):
+        self.pool.shutdown()
+
+
+    # Convert one font in the calling thread, using the shared caches. Takes
+    # the same arguments as convert_bdf.
+    def convert(self, infile, outfile=None, feature_file=None, **options):
+        options.setdefault("features", self.features)
+        options.setdefault("outline_cache", self.outlines)
+
+        return convert.convert_bdf(infile, outfile, feature_file, **options)
+
+
+    # Same as convert_to_bytes, using the shared caches.
+    def convert_bytes(self, bdf_data, feature_text=None):
+        return convert.convert_to_bytes(
+            bdf_data,
+            feature_text,
+            features=self.features,
+            outline_cache=self.outlines,
+        )
+
+
+    # Start converting BDF data on the pool. Returns a Future for the TTF data.
+    def submit_bytes(self, bdf_data, feature_text=None):
+        if self.executor == "process":
+            return self.pool.submit(_convert_bytes_in_worker, bdf_data, feature_text)
+
+        return self.pool.submit(self.convert_bytes, bdf_data, feature_text)
+
+
+    # Start converting a font file on the pool. Returns a Future for the output
+    # file name.
+    def submit(self, infile, outfile=None, feature_file_name=None):
+        if self.executor == "process":
+            return self.pool.submit(_convert_in_worker, infile, outfile, feature_file_name)
+
+        return self.pool.submit(
+            convert.convert_bdf_file,
+            infile,
+            outfile,
+            feature_file_name,
+            features=self.features,
+            outline_cache=self.outlines,
+        )
+
+
+    # Convert many font files concurrently. Returns a list of (infile,
+    # font_filename, error) tuples, in the same order as infiles.
+    def convert_many(self, infiles, out_dir=None, feature_file_name=None):
+        if out_dir != None:
+            os.makedirs(out_dir, exist_ok=True)
+
+        futures = [
+            self.submit(infile, batch.output_filename(infile, out_dir), feature_file_name)
+            for infile in infiles
+        ]
+
+        results = []
+        for infile, future in zip(infiles, futures):
+            try:
+                font_filename = future.result()
+            except Exception as error:
+                results.append((infile, None, batch.describe_error(error)))
+                continue
+
+            if isinstance(font_filename, list):
+                font_filename = ", ".join(map(os.fspath, font_filename))
+            results.append((infile, os.fspath(font_filename), None))
+
+        return results
@@ -0,0 +1,124 @@
+"""
+Build the hdmx, LTSH and VDMX device metric tables.
+
+Rasterizers use these tables to get exact advances and line heights at a given
+ppem, without running hinting or scaling every glyph first. Pixel fonts are
+mostly used at their native size or whole multiples of it, where every outline
+coordinate lands exactly on a device pixel, so the tables can be calculated
+directly from the outlines and are exact.
+"""
+
+import math
+import re
+
+from fontTools.ttLib import newTable
+
+
+# The native size and its first few multiples, which pixel fonts are mostly
+# used at
+COMMON_PPEMS = "1x,2x,3x,4x"
+
+# hdmx stores ppems and widths as single bytes
+MAX_PPEM = 255
+MAX_WIDTH = 255
+
+
+# Parse a list of ppems like "1x,2x,24". Values ending in x are multiples of
+# the font's native size. Returns a list of (value, is_multiple) tuples; an
+# empty string or "none" gives an empty list.
+def parse_ppems(text):
+    if text.strip().lower() in ("", "none"):
+        return []
+
+    ppems = []
+    for item in re.split(r"[\s,]+", text.strip()):
+        match = re.fullmatch(r"([0-9]+)(x?)", item, re.IGNORECASE)
+        if not match or int(match.group(1)) == 0:
+            raise ValueError(f"bad ppem: {item!r}")
+
+        ppems.append((int(match.group(1)), bool(match.group(2))))
+
+    return ppems
+
+
+# Turn parsed ppems into a sorted list of ppems for a font of font_size pixels.
+def resolve_ppems(ppems, font_size):
+    resolved = {value * font_size if is_multiple else value for value, is_multiple in ppems}
+    return sorted(ppem for ppem in resolved if ppem <= MAX_PPEM)
+
+
+def _scale(value, ppem, units_per_em):
+    return value * ppem / units_per_em
+
+
+def hdmx_table(font, ppems):
+    units_per_em = font["head"].unitsPerEm
+    metrics = font["hmtx"].metrics
+
+    hdmx = newTable("hdmx")
+    hdmx.hdmx = {}
+    for ppem in ppems:
+        widths = {
+            name: round(_scale(advance, ppem, units_per_em))
+            for name, (advance, _) in metrics.items()
+        }
+        # Skip sizes where a glyph is too wide to record
+        if max(widths.values()) <= MAX_WIDTH:
+            hdmx.hdmx[ppem] = widths
+
+    return hdmx
+
+
+# Outlines are never hinted, so every advance scales linearly from the
+# smallest size up.
+def ltsh_table(font):
+    ltsh = newTable("LTSH")
+    ltsh.version = 0
+    ltsh.yPels = {name: 1 for name in font.getGlyphOrder()}
+
+    return ltsh
+
+
+def vdmx_table(font, ppems):
+    units_per_em = font["head"].unitsPerEm
+    glyf = font["glyf"]
+
+    y_max = 0
+    y_min = 0
+    for name in font.getGlyphOrder():
+        glyph = glyf[name]
+        if glyph.numberOfContours:
+            y_max = max(y_max, glyph.yMax)
+            y_min = min(y_min, glyph.yMin)
+
+    vdmx = newTable("VDMX")
+    vdmx.version = 1
+    # A single ratio range, which applies to every aspect ratio. The extents
+    # cover every glyph, not just the Windows ANSI subset.
+    vdmx.ratRanges = [{
+        "bCharSet": 0,
+        "xRatio": 0,
+        "yStartRatio": 0,
+        "yEndRatio": 0,
+        "groupIndex": 0,
+    }]
+    vdmx.groups = [{
+        ppem: (
+            math.ceil(_scale(y_max, ppem, units_per_em)),
+            math.floor(_scale(y_min, ppem, units_per_em)),
+        )
+        for ppem in ppems
+    }]
+
+    return vdmx
+
+
+# Add hdmx, LTSH and VDMX tables to a finished TrueType font, for each of the
+# given ppems.
+def add_device_metrics(font, ppems):
+    if not ppems:
+        return
+
+    font["hdmx"] = hdmx_table(font, ppems)
+    font["LTSH"] = ltsh_table(font)
+    font["VDMX"] = vdmx_table(font, ppems)
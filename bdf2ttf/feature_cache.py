@@ -0,0 +1,223 @@
+"""
+Cache compiled OpenType features.
+
+Compiling a large feature file with feaLib is often slower than building the
+outlines of a whole font, and a font family usually shares one feature file
+across all of its styles. Two levels of caching are used:
+
+* Parsed feature files are kept in memory, keyed by the feature file contents
+  and the set of glyph names (which the parser needs to resolve glyph ranges).
+* Compiled GSUB, GPOS, GDEF and BASE tables are kept in memory, and optionally
+  on disk, keyed by the feature file contents, the glyph order, and the
+  fontTools version.
+
+Only the feature file itself is hashed. If it uses ``include`` statements, the
+disk cache must be cleared when an included file changes.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+
+from collections import OrderedDict
+
+import fontTools
+
+from fontTools.feaLib import ast
+from fontTools.feaLib.builder import addOpenTypeFeatures
+from fontTools.feaLib.parser import Parser
+from fontTools.otlLib.maxContextCalc import maxCtxFont
+from fontTools.ttLib import TTFont, newTable
+
+from bdf2ttf import manifest
+
+
+# Tables that feaLib can build without touching any other table in the font.
+LAYOUT_TABLES = ("GDEF", "GSUB", "GPOS", "BASE")
+
+
+class FeatureCache:
+    def __init__(self, cache_dir=None, max_entries=16):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+        self._parse_trees = OrderedDict()
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    # Add the features from feature_file to font, reusing cached results where
+    # possible. font must already have its final glyph order.
+    def add_features(self, font, feature_file):
+        apply_features(font, self.compile(feature_file, font.getGlyphOrder()))
+
+
+    # Compile the features from feature_file for a font with the given glyph
+    # order. No other part of the font is needed, so this can run while the
+    # font itself is being built. Pass the result to apply_features.
+    def compile(self, feature_file, glyph_order):
+        feature_hash = manifest.hash_file(feature_file)
+
+        key = self.table_key(feature_hash, glyph_order)
+        tables = self._lookup(self._tables, key)
+        if tables is None:
+            tables = self._load(key)
+
+        if tables is None:
+            parse_tree = self.parse(feature_file, feature_hash, glyph_order)
+
+            if not layout_only(parse_tree):
+                # The feature file changes tables like name or OS/2, which
+                # can't be built separately from the rest of the font.
+                return parse_tree
+
+            tables = compile_layout_tables(parse_tree, glyph_order)
+            self._save(key, tables)
+
+        self._remember(self._tables, key, tables)
+        return tables
+
+
+    def parse(self, feature_file, feature_hash, glyph_order):
+        key = (feature_hash, _digest(sorted(glyph_order)))
+
+        parse_tree = self._lookup(self._parse_trees, key)
+        if parse_tree is None:
+            parse_tree = Parser(feature_file, set(glyph_order)).parse()
+            self._remember(self._parse_trees, key, parse_tree)
+
+        return parse_tree
+
+
+    def table_key(self, feature_hash, glyph_order):
+        return _digest([fontTools.version, feature_hash] + list(glyph_order))
+
+
+    def _lookup(self, entries, key):
+        with self._lock:
+            if key not in entries:
+                return None
+
+            entries.move_to_end(key)
+            return entries[key]
+
+
+    def _remember(self, entries, key, value):
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+
+    def _cache_file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+
+        try:
+            with open(self._cache_file(key), "r") as stream:
+                encoded = json.load(stream)
+        except (OSError, ValueError):
+            return None
+
+        return {tag: base64.b64decode(data) for tag, data in encoded.items()}
+
+
+    def _save(self, key, tables):
+        if not self.cache_dir:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        encoded = {tag: base64.b64encode(data).decode() for tag, data in tables.items()}
+
+        # Several conversions may share a cache directory, so never leave a
+        # partially written entry behind.
+        cache_file = self._cache_file(key)
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w") as stream:
+            json.dump(encoded, stream)
+        os.replace(temp_file, cache_file)
+
+
+def _digest(names):
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(name.encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+# Return True if building the feature file only produces layout tables.
+def layout_only(block):
+    for statement in block.statements:
+        if isinstance(statement, ast.TableBlock) and statement.name not in LAYOUT_TABLES:
+            return False
+        if isinstance(statement, ast.NameRecord):
+            return False
+        if isinstance(statement, ast.Block) and not layout_only(statement):
+            return False
+
+    return True
+
+
+# Build the layout tables in a font that contains nothing but a glyph order,
+# and return the binary data of each table.
+def compile_layout_tables(parse_tree, glyph_order):
+    skeleton = TTFont()
+    skeleton.setGlyphOrder(glyph_order)
+
+    addOpenTypeFeatures(skeleton, parse_tree, tables=LAYOUT_TABLES)
+
+    tables = {}
+    for tag in LAYOUT_TABLES:
+        if tag in skeleton:
+            tables[tag] = skeleton[tag].compile(skeleton)
+
+    return tables
+
+
+# Add the result of FeatureCache.compile to font.
+def apply_features(font, compiled):
+    if isinstance(compiled, ast.FeatureFile):
+        addOpenTypeFeatures(font, compiled)
+    else:
+        attach_layout_tables(font, compiled)
+
+
+def attach_layout_tables(font, tables):
+    for tag in LAYOUT_TABLES:
+        if tag in font:
+            del font[tag]
+
+    for tag, data in tables.items():
+        table = newTable(tag)
+        table.decompile(data, font)
+        font[tag] = table
+
+    if "OS/2" in font and any(tag in font for tag in ("GSUB", "GPOS")):
+        font["OS/2"].usMaxContext = maxCtxFont(font)
+
+
+# Shared by every conversion in this process, so fonts in the same batch reuse
+# each other's features.
+default_cache = FeatureCache()
+
+_shared_caches = {None: default_cache}
+
+
+# Return the cache shared by every conversion in this process that uses
+# cache_dir for its disk cache.
+def shared_cache(cache_dir=None):
+    if cache_dir not in _shared_caches:
+        _shared_caches[cache_dir] = FeatureCache(cache_dir=cache_dir)
+
+    return _shared_caches[cache_dir]
@@ -0,0 +1,240 @@
+"""
+Write a converted font in several formats.
+
+The outlines are built once, and the font is compiled to TrueType data once.
+Every other format starts from that data: each one loads its own copy of the
+font, so several formats can be serialized on separate threads without
+sharing any fontTools objects.
+"""
+
+import io
+import logging
+import os
+import zlib
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.misc import sstruct
+from fontTools.misc.textTools import Tag
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.ttLib import TTFont, sfnt
+
+try:
+    import cffsubr
+except ImportError:
+    cffsubr = None
+
+try:
+    from zopfli import zlib as zopfli_zlib
+except ImportError:
+    zopfli_zlib = None
+
+
+log = logging.getLogger("bdf2ttf")
+
+FORMATS = ("ttf", "otf", "woff")
+
+# Fonts smaller than this are compressed one table at a time.
+PARALLEL_WOFF_SIZE = 1 << 18
+
+
+# Parse format lists like ["ttf,otf", "woff"], as given to --format. Returns
+# the formats in the order given, without duplicates.
+def parse_formats(values):
+    formats = []
+    for value in values:
+        for fmt in value.split(","):
+            fmt = fmt.strip().lower()
+            if fmt not in FORMATS:
+                raise ValueError(f"unknown format: {fmt!r} (choose from {', '.join(FORMATS)})")
+            if fmt not in formats:
+                formats.append(fmt)
+
+    return formats
+
+
+# Return the file name for each format. If outfile is given, the format it
+# names keeps that name, and the others replace its extension. A single format
+# can be written to any file name. Without outfile, each file is named after
+# the font.
+def output_filenames(outfile, postscript_name, formats):
+    if outfile == None:
+        return [f"{postscript_name}.{fmt}" for fmt in formats]
+
+    stem, ext = os.path.splitext(outfile)
+    ext = ext.lower()[1:]
+    if len(formats) == 1 and ext not in FORMATS:
+        return [outfile]
+
+    return [outfile if ext == fmt else f"{stem}.{fmt}" for fmt in formats]
+
+
+def _load(ttf_data):
+    return TTFont(io.BytesIO(ttf_data))
+
+
+def _save(font):
+    stream = io.BytesIO()
+    font.save(stream)
+    return stream.getvalue()
+
+
+# Replace the TrueType outlines of font with CFF outlines, or CFF2 outlines if
+# cff_version is 2. The charstrings are specialized by T2CharStringPen, and
+# subroutinized if subroutinize is set and cffsubr is installed.
+def convert_to_cff(font, cff_version=1, subroutinize=True):
+    glyph_order = font.getGlyphOrder()
+    glyph_set = font.getGlyphSet()
+    metrics = font["hmtx"].metrics
+
+    # Most pixel fonts are monospaced, or nearly so. Glyphs with the most
+    # common advance leave their width out of the charstring, and the others
+    # store a small difference from it.
+    advances = Counter(advance for advance, _ in metrics.values())
+    default_width = advances.most_common(1)[0][0]
+    private = {"defaultWidthX": default_width, "nominalWidthX": default_width}
+
+    charstrings = {}
+    for name in glyph_order:
+        if cff_version == 2:
+            pen = T2CharStringPen(None, glyph_set, CFF2=True)
+        else:
+            advance = metrics[name][0]
+            width = None if advance == default_width else advance - default_width
+            pen = T2CharStringPen(width, glyph_set)
+        glyph_set[name].draw(pen)
+        charstrings[name] = pen.getCharString()
+
+    for tag in ("glyf", "loca"):
+        del font[tag]
+    font["maxp"].tableVersion = 0x00005000
+
+    builder = FontBuilder(font=font)
+    if cff_version == 2:
+        builder.setupCFF2(charstrings)
+    else:
+        names = font["name"]
+        font_info = {
+            "FullName": names.getDebugName(4),
+            "FamilyName": names.getDebugName(1),
+            "Weight": names.getDebugName(2),
+            "version": names.getDebugName(5),
+        }
+        copyright = names.getDebugName(0)
+        if copyright:
+            font_info["Notice"] = copyright
+
+        builder.setupCFF(names.getDebugName(6), font_info, charstrings, private)
+
+    if subroutinize:
+        if cffsubr == None:
+            log.warning(
+                "cffsubr is not installed, so CFF charstrings are not subroutinized; "
+                "install bdf2ttf[cffsubr], or pass --no-subroutinize"
+            )
+        else:
+            cffsubr.subroutinize(font)
+
+
+def to_ttf(ttf_data):
+    return ttf_data
+
+
+def to_otf(ttf_data, cff_version=1, subroutinize=True):
+    font = _load(ttf_data)
+    convert_to_cff(font, cff_version, subroutinize)
+    return _save(font)
+
+
+# Compress one table for WOFF. Tables that don't get smaller are stored as
+# they are, as the WOFF specification requires.
+def _compress_table(data, level, zopfli):
+    if level == 0:
+        return data
+
+    if zopfli:
+        compressed = zopfli_zlib.compress(data, numiterations=sfnt.ZOPFLI_LEVELS[level])
+    else:
+        compressed = zlib.compress(data, level)
+
+    return compressed if len(compressed) < len(data) else data
+
+
+# Compress an sfnt into WOFF 1.0. level is the zlib compression level, from 0
+# to 9. If zopfli is set and the zopfli module is installed, it is used
+# instead of zlib, which is much slower but a few percent smaller. Tables are
+# compressed on separate threads once the font is large enough for that to
+# pay off; zlib and zopfli both release the GIL while compressing.
+def to_woff(ttf_data, level=9, zopfli=False):
+    if not 0 <= level <= 9:
+        raise ValueError(f"bad WOFF compression level: {level}")
+    if zopfli and zopfli_zlib == None:
+        log.warning("zopfli is not installed, so WOFF tables are compressed with zlib; "
+                    "install bdf2ttf[zopfli]")
+        zopfli = False
+
+    reader = sfnt.SFNTReader(io.BytesIO(ttf_data))
+    tags = sorted(reader.keys())
+    tables = [reader[tag] for tag in tags]
+
+    if len(ttf_data) < PARALLEL_WOFF_SIZE:
+        compressed = [_compress_table(data, level, zopfli) for data in tables]
+    else:
+        with ThreadPoolExecutor() as pool:
+            compressed = list(pool.map(_compress_table, tables, repeat(level), repeat(zopfli)))
+
+    offset = sfnt.woffDirectorySize + sfnt.woffDirectoryEntrySize * len(tags)
+    entries = []
+    for tag, data, table_data in zip(tags, tables, compressed):
+        entries.append(sstruct.pack(sfnt.woffDirectoryEntryFormat, {
+            "tag": Tag(tag).tobytes(),
+            "offset": offset,
+            "length": len(table_data),
+            "origLength": len(data),
+            "checkSum": reader.tables[tag].checkSum,
+        }))
+        offset += _padded(len(table_data))
+
+        log.info("woff %s: %d -> %d bytes", tag, len(data), len(table_data))
+
+    header = sstruct.pack(sfnt.woffDirectoryFormat, {
+        "signature": b"wOFF",
+        "sfntVersion": Tag(reader.sfntVersion).tobytes(),
+        "length": offset,
+        "numTables": len(tags),
+        "reserved": 0,
+        "totalSfntSize": (
+            sfnt.sfntDirectorySize
+            + sfnt.sfntDirectoryEntrySize * len(tags)
+            + sum(_padded(len(data)) for data in tables)
+        ),
+        "majorVersion": 1,
+        "minorVersion": 0,
+        "metaOffset": 0,
+        "metaLength": 0,
+        "metaOrigLength": 0,
+        "privOffset": 0,
+        "privLength": 0,
+    })
+
+    return b"".join([header, *entries, *(_pad(data) for data in compressed)])
+
+
+def _padded(length):
+    return (length + 3) & ~3
+
+
+def _pad(data):
+    return data + b"\0" * (_padded(len(data)) - len(data))
+
+
+# Each takes TrueType data and optional keyword arguments for that format, and
+# returns the data of a font in that format.
+SERIALIZERS = {
+    "ttf": to_ttf,
+    "otf": to_otf,
+    "woff": to_woff,
+}
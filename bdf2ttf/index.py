@@ -0,0 +1,327 @@
+"""
+Index a collection of bitmap fonts in a SQLite database.
+
+Every BDF file under a directory is read once: the header goes through the
+same header-only path as `bdf2ttf --info`, and the glyphs are scanned line by
+line for their codepoints and bitmaps, without building a bdflib glyph for
+each one. Files are read on a pool of worker processes, and the results are
+written to the database by the main process.
+
+On later runs, only files whose size or modification time changed are read
+again, and files that no longer exist are dropped from the index.
+
+The database has two tables:
+
+* ``fonts``: one row per file, with its path relative to the indexed
+  directory, its size and mtime, and the font's names, style, weight, pixel
+  size and glyph count. ``error`` is set if the file couldn't be read.
+* ``glyphs``: one row per glyph, with its font, name, codepoint (NULL if
+  unencoded) and bitmap hash. Glyphs with the same image at the same position
+  have the same hash, whichever font they are in.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from bdf2ttf import batch, convert
+
+
+# Bump this when the schema, or the way glyphs are hashed, changes. An index
+# with a different version is rebuilt from scratch.
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE fonts (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    family TEXT,
+    style TEXT,
+    postscript_name TEXT,
+    weight INTEGER,
+    weight_name TEXT,
+    is_bold INTEGER,
+    is_italic INTEGER,
+    is_monospace INTEGER,
+    pixel_size INTEGER,
+    glyph_count INTEGER,
+    error TEXT
+);
+CREATE TABLE glyphs (
+    font_id INTEGER NOT NULL REFERENCES fonts(id),
+    name TEXT NOT NULL,
+    codepoint INTEGER,
+    bitmap_hash TEXT NOT NULL
+);
+CREATE INDEX glyphs_font ON glyphs(font_id);
+CREATE INDEX glyphs_codepoint ON glyphs(codepoint);
+CREATE INDEX glyphs_bitmap_hash ON glyphs(bitmap_hash);
+"""
+
+DEFAULT_DATABASE_NAME = "bdf2ttf-index.sqlite"
+
+# Commit after this many files, so an interrupted run keeps most of its work.
+COMMIT_INTERVAL = 64
+
+
+# A hash of a glyph's bounding box and bitmap. Rows are trimmed to the bytes
+# the glyph's width needs, so padding doesn't make identical glyphs differ.
+def bitmap_hash(bbx, rows):
+    width = int(bbx[0]) if bbx else 0
+    row_length = 2 * ((width + 7) // 8)
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b" ".join(bbx))
+    for row in rows:
+        digest.update(b"\n")
+        digest.update(row[:row_length].upper())
+
+    return digest.hexdigest()
+
+
+# Scan the glyphs of a BDF file, and yield (name, codepoint, bitmap_hash) for
+# each one. lines must be positioned after the CHARS line.
+def scan_glyphs(lines):
+    name = None
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+
+        keyword = fields[0]
+        if keyword == b"STARTCHAR":
+            name = line.strip()[len(b"STARTCHAR"):].strip().decode("latin-1")
+            codepoint = None
+            bbx = []
+            rows = None
+        elif name == None:
+            continue
+        elif keyword == b"ENCODING":
+            codepoint = int(fields[1])
+            if codepoint < 0:
+                codepoint = None
+        elif keyword == b"BBX":
+            bbx = fields[1:5]
+        elif keyword == b"BITMAP":
+            rows = []
+        elif keyword == b"ENDCHAR":
+            yield name, codepoint, bitmap_hash(bbx, rows or [])
+            name = None
+        elif rows != None:
+            rows.append(keyword)
+
+
+# Read one font file, and return a dict with its header information and a
+# list of its glyphs.
+def index_file(path):
+    with open(path, "rb") as stream:
+        # font_info stops reading at the CHARS line, so the glyphs come next.
+        info = convert.font_info(stream)
+        glyphs = list(scan_glyphs(stream))
+
+    info["glyphs"] = glyphs
+    return info
+
+
+# Runs in a worker process. Errors are returned as strings so that one bad
+# font doesn't stop the scan.
+def _index_one(path):
+    try:
+        return path, index_file(path), None
+    except Exception as error:
+        return path, None, batch.describe_error(error)
+
+
+def open_database(filename):
+    db = sqlite3.connect(filename)
+
+    (version,) = db.execute("PRAGMA user_version").fetchone()
+    if version != SCHEMA_VERSION:
+        db.executescript("DROP TABLE IF EXISTS glyphs; DROP TABLE IF EXISTS fonts;")
+        db.executescript(SCHEMA)
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        db.commit()
+
+    return db
+
+
+def _store(db, relpath, stat, info, error):
+    info = info or {}
+    cursor = db.execute(
+        """
+        INSERT INTO fonts (
+            path, size, mtime_ns, family, style, postscript_name, weight,
+            weight_name, is_bold, is_italic, is_monospace, pixel_size,
+            glyph_count, error
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            relpath,
+            stat.st_size,
+            stat.st_mtime_ns,
+            info.get("family"),
+            info.get("style"),
+            info.get("postscript_name"),
+            info.get("weight"),
+            info.get("weight_name"),
+            info.get("is_bold"),
+            info.get("is_italic"),
+            info.get("is_monospace"),
+            info.get("font_size"),
+            len(info["glyphs"]) if "glyphs" in info else None,
+            error,
+        ),
+    )
+
+    db.executemany(
+        "INSERT INTO glyphs (font_id, name, codepoint, bitmap_hash) VALUES (?, ?, ?, ?)",
+        ((cursor.lastrowid, *glyph) for glyph in info.get("glyphs", ())),
+    )
+
+
+def _remove(db, relpath):
+    row = db.execute("SELECT id FROM fonts WHERE path = ?", (relpath,)).fetchone()
+    if row != None:
+        db.execute("DELETE FROM glyphs WHERE font_id = ?", row)
+        db.execute("DELETE FROM fonts WHERE id = ?", row)
+
+
+def _index_all(paths, jobs):
+    if jobs == 1 or len(paths) <= 1:
+        yield from map(_index_one, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Results are stored as they arrive, in input order.
+        yield from pool.map(_index_one, paths, chunksize=4)
+
+
+# Statistics on glyph bitmaps used more than once, across the whole index.
+def duplicate_stats(db):
+    (glyphs, bitmaps) = db.execute(
+        "SELECT count(*), count(DISTINCT bitmap_hash) FROM glyphs"
+    ).fetchone()
+    (shared,) = db.execute(
+        """
+        SELECT count(*) FROM (
+            SELECT bitmap_hash FROM glyphs
+            GROUP BY bitmap_hash HAVING count(DISTINCT font_id) > 1
+        )
+        """
+    ).fetchone()
+
+    return {
+        "glyphs": glyphs,
+        "distinct_bitmaps": bitmaps,
+        "duplicate_glyphs": glyphs - bitmaps,
+        "shared_bitmaps": shared,
+    }
+
+
+# Bring the index of directory up to date. Returns a dict counting the files
+# that were indexed, unchanged, removed and failed, with the failures listed
+# as (path, error) tuples under "errors", and the duplicate glyph statistics.
+def update_index(directory, database=None, jobs=None):
+    if database == None:
+        database = os.path.join(directory, DEFAULT_DATABASE_NAME)
+
+    db = open_database(database)
+    try:
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in db.execute("SELECT path, size, mtime_ns FROM fonts")
+        }
+
+        summary = {"indexed": 0, "unchanged": 0, "removed": 0, "failed": 0, "errors": []}
+
+        changed = {}
+        for path in batch.expand_inputs([directory]):
+            stat = os.stat(path)
+            if known.pop(os.path.relpath(path, directory), None) == (stat.st_size, stat.st_mtime_ns):
+                summary["unchanged"] += 1
+            else:
+                changed[path] = stat
+
+        # Whatever is left no longer exists
+        for relpath in known:
+            _remove(db, relpath)
+            summary["removed"] += 1
+        db.commit()
+
+        results = _index_all(list(changed), jobs)
+        for count, (path, info, error) in enumerate(results, 1):
+            relpath = os.path.relpath(path, directory)
+            _remove(db, relpath)
+            _store(db, relpath, changed[path], info, error)
+
+            if error == None:
+                summary["indexed"] += 1
+            else:
+                summary["failed"] += 1
+                summary["errors"].append((path, error))
+
+            if count % COMMIT_INTERVAL == 0:
+                db.commit()
+        db.commit()
+
+        summary.update(duplicate_stats(db))
+    finally:
+        db.close()
+
+    return summary
+
+
+def print_summary(summary, file=sys.stderr):
+    for path, error in summary["errors"]:
+        print(f"FAILED  {path}: {error}", file=file)
+
+    print(
+        f"{summary['indexed']} indexed, {summary['unchanged']} unchanged, "
+        f"{summary['removed']} removed, {summary['failed']} failed",
+        file=file,
+    )
+    print(
+        f"{summary['glyphs']} glyphs, {summary['distinct_bitmaps']} distinct bitmaps, "
+        f"{summary['duplicate_glyphs']} duplicates, "
+        f"{summary['shared_bitmaps']} bitmaps shared between fonts",
+        file=file,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bdf2ttf index",
+        description=__doc__.splitlines()[1],
+    )
+    parser.add_argument("directory", help="""
+            The directory to index. It is searched recursively for BDF files.
+            """)
+    parser.add_argument("--db", help=f"""
+            The SQLite database to write. Defaults to {DEFAULT_DATABASE_NAME}
+            in the indexed directory.
+            """)
+    parser.add_argument("-j", "--jobs", type=int, help="""
+            The number of files to read at once. Defaults to the number of
+            CPUs.
+            """)
+
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+
+    summary = update_index(args.directory, database=args.db, jobs=args.jobs)
+    print_summary(summary)
+
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Record the inputs of a conversion, so unchanged fonts can be skipped.
+
+A manifest is a small JSON file written after a successful conversion. It
+holds a fingerprint built from the BDF contents, the feature file contents,
+the conversion options, and the versions of bdf2ttf and fontTools. If a later
+conversion computes the same fingerprint, and the output file recorded in the
+manifest hasn't been touched since, the conversion can return immediately.
+"""
+
+import hashlib
+import json
+import os
+
+from importlib import metadata
+
+import fontTools
+
+
+MANIFEST_VERSION = 1
+
+
+def tool_versions():
+    try:
+        bdf2ttf_version = metadata.version("bdf2ttf")
+    except metadata.PackageNotFoundError:
+        bdf2ttf_version = "unknown"
+
+    return {
+        "bdf2ttf": bdf2ttf_version,
+        "fontTools": fontTools.version,
+    }
+
+
+# Return the SHA-256 hex digest of a file's contents.
+# source can be a path, or a file object opened in binary or text mode. File
+# objects are rewound afterwards, so they can still be read by the converter.
+def hash_file(source):
+    digest = hashlib.sha256()
+
+    if hasattr(source, "read"):
+        for chunk in iter(lambda: source.read(1 << 16), source.read(0)):
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            digest.update(chunk)
+        source.seek(0)
+    else:
+        with open(source, "rb") as stream:
+            for chunk in iter(lambda: stream.read(1 << 16), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+# Return the SHA-256 hex digest of a value that can be stored as JSON, for
+# options too large to keep in the manifest themselves.
+def hash_value(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint(infile, feature_file=None, options=None):
+    inputs = {
+        "bdf": hash_file(infile),
+        "feature_file": hash_file(feature_file) if feature_file is not None else None,
+    }
+    record = {
+        "manifest_version": MANIFEST_VERSION,
+        "inputs": inputs,
+        "options": options or {},
+        "versions": tool_versions(),
+    }
+
+    encoded = json.dumps(record, sort_keys=True).encode()
+    record["fingerprint"] = hashlib.sha256(encoded).hexdigest()
+
+    return record
+
+
+def _output_stat(filename):
+    stat = os.stat(filename)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+# If the manifest matches the fingerprint, and its output files are unchanged,
+# return the name of the output file. Otherwise, return None. If all_outputs
+# is set, return a list of every output file instead.
+def up_to_date(manifest_file, record, all_outputs=False):
+    try:
+        with open(manifest_file, "r") as stream:
+            previous = json.load(stream)
+    except (OSError, ValueError):
+        return None
+
+    if previous.get("fingerprint") != record["fingerprint"]:
+        return None
+
+    output = previous.get("output")
+    if not output:
+        return None
+
+    outputs = previous.get("outputs", [output])
+    try:
+        for output in outputs:
+            if _output_stat(output["filename"]) != output["stat"]:
+                return None
+    except (OSError, KeyError, TypeError):
+        return None
+
+    if all_outputs:
+        return [output["filename"] for output in outputs]
+
+    return outputs[0]["filename"]
+
+
+# font_filename can also be a list of files written by one conversion. The
+# first one is recorded as the output.
+def write_manifest(manifest_file, record, font_filename):
+    font_filenames = font_filename if isinstance(font_filename, list) else [font_filename]
+    outputs = [
+        {"filename": os.fspath(filename), "stat": _output_stat(filename)}
+        for filename in font_filenames
+    ]
+
+    manifest = dict(record)
+    manifest["output"] = outputs[0]
+    if len(outputs) > 1:
+        manifest["outputs"] = outputs
+
+    manifest_dir = os.path.dirname(manifest_file)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+
+    # Write to a temporary file first, so an interrupted run never leaves a
+    # manifest that looks valid.
+    temp_file = f"{manifest_file}.tmp"
+    with open(temp_file, "w") as stream:
+        json.dump(manifest, stream, indent=2, sort_keys=True)
+        stream.write("\n")
+    os.replace(temp_file, manifest_file)
@@ -0,0 +1,197 @@
+"""
+Run a conversion daemon on a Unix domain socket.
+
+The daemon keeps fontTools imported and its outline and feature caches warm,
+so each conversion only costs the conversion itself. Use `bdf2ttf client`, or
+bdf2ttf.client.convert_remote, to talk to it. See bdf2ttf.client for the
+protocol.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from bdf2ttf import batch
+from bdf2ttf.client import default_socket_path, recv_frame, send_frame
+from bdf2ttf.converter import Converter
+
+
+class ConversionHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.begin_request()
+        try:
+            header = json.loads(recv_frame(self.request))
+            bdf_data = recv_frame(self.request)
+
+            font_data = self.server.convert(header, bdf_data)
+        except ConnectionError:
+            return
+        except Exception as error:
+            self._respond({"ok": False, "error": batch.describe_error(error)}, b"")
+        else:
+            self._respond({"ok": True}, font_data)
+        finally:
+            self.server.end_request()
+
+
+    def _respond(self, header, data):
+        try:
+            send_frame(self.request, json.dumps(header).encode())
+            send_frame(self.request, data)
+        except OSError:
+            # The client went away
+            pass
+
+
+class ConversionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, max_concurrent=None, idle_timeout=None, feature_cache_dir=None):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+
+        # Conversions run on worker processes, so they don't share the GIL.
+        # Requests beyond max_concurrent wait in the pool's queue.
+        self.converter = Converter(
+            executor="process",
+            max_workers=max_concurrent,
+            feature_cache_dir=feature_cache_dir,
+        )
+
+        self.active_requests = 0
+        self.last_activity = time.monotonic()
+        self.activity_lock = threading.Lock()
+
+        super().__init__(socket_path, ConversionHandler)
+
+
+    def server_bind(self):
+        _remove_stale_socket(self.socket_path)
+
+        # Only the user running the daemon may connect to it
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+
+
+    def server_close(self):
+        super().server_close()
+        self.converter.close()
+
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+    def begin_request(self):
+        with self.activity_lock:
+            self.active_requests += 1
+
+
+    def end_request(self):
+        with self.activity_lock:
+            self.active_requests -= 1
+            self.last_activity = time.monotonic()
+
+
+    def is_idle(self):
+        if not self.idle_timeout:
+            return False
+
+        with self.activity_lock:
+            return (
+                self.active_requests == 0
+                and time.monotonic() - self.last_activity > self.idle_timeout
+            )
+
+
+    def convert(self, header, bdf_data):
+        if not bdf_data:
+            with open(header["path"], "rb") as infile:
+                bdf_data = infile.read()
+
+        feature_text = header.get("feature_text")
+        if feature_text == None and header.get("feature_path"):
+            with open(header["feature_path"], "r") as feature_file:
+                feature_text = feature_file.read()
+
+        return self.converter.submit_bytes(bdf_data, feature_text).result()
+
+
+    # Handle requests until the daemon has been idle for idle_timeout seconds,
+    # or forever if there is no idle timeout.
+    def serve_until_idle(self, poll_interval=0.5):
+        self.timeout = poll_interval
+
+        while not self.is_idle():
+            self.handle_request()
+
+
+# A socket file left behind by a daemon that didn't shut down cleanly would
+# make bind() fail. Remove it, but never steal the socket of a live daemon.
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+            return
+
+    raise OSError(f"a daemon is already listening on {socket_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bdf2ttf serve",
+        description=__doc__.splitlines()[1],
+    )
+    parser.add_argument("-s", "--socket", default=default_socket_path(), help="""
+            The socket to listen on. Defaults to %(default)s.
+            """)
+    parser.add_argument("-j", "--max-concurrent", type=int, help="""
+            The number of worker processes, each running one conversion at a
+            time. Further requests wait for a free worker. Defaults to the
+            number of CPUs.
+            """)
+    parser.add_argument("--idle-timeout", type=float, default=0, help="""
+            Shut down after this many seconds without requests. By default,
+            the daemon runs until it is interrupted.
+            """)
+    parser.add_argument("--feature-cache", help="""
+            A directory for caching compiled OpenType features.
+            """)
+
+    args = parser.parse_args(argv)
+
+    try:
+        server = ConversionServer(
+            args.socket,
+            max_concurrent=args.max_concurrent,
+            idle_timeout=args.idle_timeout,
+            feature_cache_dir=args.feature_cache,
+        )
+    except OSError as error:
+        parser.error(str(error))
+
+    print(f"listening on {args.socket}", file=sys.stderr)
+    try:
+        server.serve_until_idle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
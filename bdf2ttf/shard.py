@@ -0,0 +1,268 @@
+"""
+Split a large bitmap font into shards for progressive loading on the web.
+
+Each shard holds the glyphs for a set of codepoints, either whole Unicode
+blocks or the next slice of a frequency-ranked character list. Every shard is
+converted straight from the BDF file, leaving out the other shards' glyphs
+before they are decoded, so the full font is never built. Shards are converted
+in parallel, and a CSS file with an @font-face rule per shard, each with its
+own unicode-range, is written next to them. Browsers then only download the
+shards a page uses.
+"""
+
+import argparse
+import math
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from fontTools import unicodedata
+
+from bdf2ttf import batch, convert, formats as output_formats, subset
+
+
+DEFAULT_SHARDS = 8
+
+CSS_FORMATS = {
+    "ttf": "truetype",
+    "otf": "opentype",
+    "woff": "woff",
+}
+
+
+# Return the sorted codepoints of every encoded glyph in a BDF file. Only the
+# STARTCHAR and ENCODING lines are looked at.
+def font_codepoints(lines):
+    codepoints = set()
+    for line in lines:
+        if line.startswith(b"ENCODING"):
+            codepoint = int(line.split()[1])
+            if codepoint >= 0:
+                codepoints.add(codepoint)
+
+    return sorted(codepoints)
+
+
+def _chunks(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+# Group codepoints into shards of about max_glyphs each, without splitting a
+# Unicode block unless the block alone is bigger than that.
+def split_by_blocks(codepoints, max_glyphs):
+    blocks = []
+    for codepoint in codepoints:
+        block = unicodedata.block(chr(codepoint))
+        if blocks and blocks[-1][0] == block:
+            blocks[-1][1].append(codepoint)
+        else:
+            blocks.append((block, [codepoint]))
+
+    shards = []
+    current = []
+    for _, block_codepoints in blocks:
+        if current and len(current) + len(block_codepoints) > max_glyphs:
+            shards.append(current)
+            current = []
+
+        if len(block_codepoints) > max_glyphs:
+            shards.extend(_chunks(block_codepoints, max_glyphs))
+        else:
+            current.extend(block_codepoints)
+
+    if current:
+        shards.append(current)
+
+    return shards
+
+
+# Group codepoints into shards of max_glyphs each, most frequent first.
+# ranking is a sequence of characters, most frequent first. Codepoints it
+# doesn't mention come last, in codepoint order.
+def split_by_ranking(codepoints, ranking, max_glyphs):
+    available = set(codepoints)
+
+    ordered = []
+    for char in ranking:
+        codepoint = ord(char)
+        if codepoint in available:
+            ordered.append(codepoint)
+            available.discard(codepoint)
+    ordered.extend(sorted(available))
+
+    return [sorted(shard) for shard in _chunks(ordered, max_glyphs)]
+
+
+# Format codepoints as a CSS unicode-range value, like "U+20-7E, U+A0".
+def unicode_range(codepoints):
+    ranges = []
+    for codepoint in sorted(codepoints):
+        if ranges and ranges[-1][1] == codepoint - 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+
+    return ", ".join(
+        f"U+{start:X}" if start == end else f"U+{start:X}-{end:X}"
+        for start, end in ranges
+    )
+
+
+def font_face_css(info, shards, filenames, css_dir):
+    rules = []
+    for codepoints, shard_filenames in zip(shards, filenames):
+        sources = ", ".join(
+            f'url("{os.path.relpath(filename, css_dir)}") '
+            f'format("{CSS_FORMATS[os.path.splitext(filename)[1][1:]]}")'
+            for filename in shard_filenames
+        )
+        rules.append("\n".join([
+            "@font-face {",
+            f'  font-family: "{info["family"]}";',
+            f"  src: {sources};",
+            f"  font-weight: {info['weight']};",
+            f"  font-style: {'italic' if info['is_italic'] else 'normal'};",
+            f"  unicode-range: {unicode_range(codepoints)};",
+            "}",
+        ]))
+
+    return "\n\n".join(rules) + "\n"
+
+
+# Runs in a worker process. Converts the glyphs for one shard.
+def build_shard(infile, outfile, feature_file_name, formats, codepoints):
+    return convert.convert_bdf_file(
+        infile,
+        outfile,
+        feature_file_name,
+        formats=formats,
+        glyph_filter=subset.GlyphFilter(unicodes=codepoints),
+    )
+
+
+# Split infile into shards, and write them and a CSS file to out_dir. Either
+# shards (the number of shards to aim for) or max_glyphs (the most glyphs in a
+# shard) can be given. If ranking is given, shards are filled in its order
+# instead of by Unicode block. Returns the name of the CSS file and a list of
+# the file names written for each shard.
+def shard_font(infile, out_dir, formats=("woff",), feature_file_name=None, shards=None,
+               max_glyphs=None, ranking=None, jobs=None):
+    with open(infile, "rb") as stream:
+        info = convert.font_info(stream)
+        codepoints = font_codepoints(stream)
+
+    if not codepoints:
+        raise ValueError(f"{infile} has no encoded glyphs")
+
+    if max_glyphs == None:
+        max_glyphs = math.ceil(len(codepoints) / (shards or DEFAULT_SHARDS))
+
+    if ranking != None:
+        groups = split_by_ranking(codepoints, ranking, max_glyphs)
+    else:
+        groups = split_by_blocks(codepoints, max_glyphs)
+
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(infile))[0]
+    formats = list(formats)
+
+    arguments = [
+        (infile, os.path.join(out_dir, f"{stem}.{index}.{formats[0]}"), feature_file_name,
+         formats, group)
+        for index, group in enumerate(groups)
+    ]
+
+    if jobs == 1 or len(groups) <= 1:
+        filenames = [build_shard(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(build_shard, *args) for args in arguments]
+            filenames = [future.result() for future in futures]
+
+    css_filename = os.path.join(out_dir, f"{stem}.css")
+    css = font_face_css(info, groups, filenames, out_dir)
+    with open(css_filename, "w") as css_file:
+        css_file.write(css)
+
+    return css_filename, filenames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bdf2ttf shard",
+        description=__doc__.splitlines()[1],
+    )
+    parser.add_argument("infile", help="""
+            The BDF font to split.
+            """)
+    parser.add_argument("-d", "--out-dir", required=True, help="""
+            The directory to write the shards and CSS file into.
+            """)
+    parser.add_argument("-F", "--format", action="append", help=f"""
+            The formats to write each shard in, separated by commas: any of
+            {", ".join(output_formats.FORMATS)}. Defaults to woff.
+            """)
+    parser.add_argument("-n", "--shards", type=int, help=f"""
+            The number of shards to aim for. Shards are split at Unicode block
+            boundaries where possible, so there may be a few more. Defaults
+            to {DEFAULT_SHARDS}.
+            """)
+    parser.add_argument("--max-glyphs", type=int, help="""
+            The most glyphs in one shard, instead of --shards.
+            """)
+    parser.add_argument("--ranking", help="""
+            A UTF-8 text file: either a sample of text, or a list of
+            characters from most to least frequent. Shards are filled in
+            order of how often characters appear in it, instead of by
+            Unicode block, so the first shards hold the most used
+            characters. Whitespace is ignored.
+            """)
+    parser.add_argument("-f", "--feature-file", help="""
+            Include feature information from an OpenType feature file in
+            every shard. Glyphs the features refer to are kept in every shard.
+            """)
+    parser.add_argument("-j", "--jobs", type=int, help="""
+            The number of shards to convert at once. Defaults to the number
+            of CPUs.
+            """)
+
+    args = parser.parse_args(argv)
+
+    if args.shards != None and args.max_glyphs != None:
+        parser.error("--shards and --max-glyphs can't be used together")
+    if (args.shards or 1) < 1 or (args.max_glyphs or 1) < 1:
+        parser.error("--shards and --max-glyphs must be positive")
+
+    formats = ["woff"]
+    if args.format != None:
+        try:
+            formats = output_formats.parse_formats(args.format)
+        except ValueError as error:
+            parser.error(str(error))
+
+    ranking = None
+    if args.ranking != None:
+        with open(args.ranking, "r", encoding="utf-8") as ranking_file:
+            ranking = "".join(map(chr, convert.usage_ranking(ranking_file.read())))
+
+    try:
+        css_filename, filenames = shard_font(
+            args.infile,
+            args.out_dir,
+            formats=formats,
+            feature_file_name=args.feature_file,
+            shards=args.shards,
+            max_glyphs=args.max_glyphs,
+            ranking=ranking,
+            jobs=args.jobs,
+        )
+    except Exception as error:
+        print(f"{args.infile}: {batch.describe_error(error)}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"wrote {len(filenames)} shards and {css_filename}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
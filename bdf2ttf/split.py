@@ -0,0 +1,197 @@
+"""
+Split fonts with more glyphs than one font can hold.
+
+A TrueType font addresses at most 65,535 glyphs. A BDF font with more, like
+Unifont merged with its upper planes, is converted into several fonts
+instead: whole planes are kept together where they fit, and a plane too big
+for one font is split at Unicode block boundaries. Every part is converted
+straight from the BDF file, leaving out the other parts' glyphs before they
+are decoded, and the parts are converted in parallel.
+
+The parts share the family and style names, and the font-wide metrics, of the
+original font. Each gets its own full name and PostScript name, ending in its
+part number, so they can be installed side by side. They are written as
+separate fonts, or as one TrueType Collection if the output file name ends
+in .ttc.
+"""
+
+import io
+import logging
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from fontTools.ttLib import TTCollection, TTFont
+
+from bdf2ttf import convert, formats as output_formats, shard, subset
+
+
+log = logging.getLogger("bdf2ttf")
+
+MAX_GLYPHS = convert.MAX_GLYPHS
+
+PLANE_SIZE = 0x10000
+
+
+# Return the sorted codepoints of every encoded glyph in a BDF file, and the
+# names of the unencoded glyphs. Only the STARTCHAR and ENCODING lines are
+# looked at.
+def scan_glyphs(lines):
+    codepoints = set()
+    unencoded = []
+    name = None
+    for line in lines:
+        if line.startswith(b"STARTCHAR"):
+            name = line.strip()[len(b"STARTCHAR"):].strip().decode()
+        elif line.startswith(b"ENCODING"):
+            codepoint = int(line.split()[1])
+            if codepoint >= 0:
+                codepoints.add(codepoint)
+            else:
+                unencoded.append(name)
+
+    return sorted(codepoints), unencoded
+
+
+# Group codepoints into parts of at most max_glyphs each. Neighbouring planes
+# share a part while they fit, and a plane that doesn't fit in one part is
+# split by Unicode block.
+def split_by_planes(codepoints, max_glyphs):
+    planes = {}
+    for codepoint in codepoints:
+        planes.setdefault(codepoint // PLANE_SIZE, []).append(codepoint)
+
+    parts = []
+    current = []
+    for plane in sorted(planes):
+        plane_codepoints = planes[plane]
+
+        if len(plane_codepoints) > max_glyphs:
+            if current:
+                parts.append(current)
+                current = []
+            parts.extend(shard.split_by_blocks(plane_codepoints, max_glyphs))
+        elif len(current) + len(plane_codepoints) > max_glyphs:
+            parts.append(current)
+            current = list(plane_codepoints)
+        else:
+            current.extend(plane_codepoints)
+
+    if current:
+        parts.append(current)
+
+    return parts
+
+
+# Give a part its own full name and PostScript name. Family and style names
+# are left alone, so the parts stay one family.
+def rename_part(tt_font, number):
+    names = tt_font["name"]
+    human_name = f"{names.getDebugName(4)} Part {number}"
+    postscript_name = f"{names.getDebugName(6)}-Part{number}"
+
+    unique_name = names.getDebugName(3).replace(names.getDebugName(6), postscript_name)
+    names.setName(unique_name, 3, 3, 1, 0x409)
+    names.setName(human_name, 4, 3, 1, 0x409)
+    names.setName(postscript_name, 6, 3, 1, 0x409)
+
+    return postscript_name
+
+
+def part_filenames(outfile, postscript_name, number, formats):
+    if outfile != None:
+        stem, ext = os.path.splitext(outfile)
+        outfile = f"{stem}.{number}{ext}"
+
+    return output_formats.output_filenames(outfile, postscript_name, formats or ["ttf"])
+
+
+# Runs in a worker process. Converts one part, and returns the names of the
+# files written, or the TTF data if to_collection is set.
+def build_part(infile_name, outfile, feature_file_name, number, codepoints, names,
+               to_collection=False, formats=None, format_options=None, **options):
+    glyph_filter = subset.GlyphFilter(unicodes=codepoints, names=names)
+
+    with open(infile_name, "rb") as infile:
+        if feature_file_name == None:
+            _, tt_font = convert.build_opentype(infile, glyph_filter=glyph_filter, **options)
+        else:
+            with open(feature_file_name, "r") as feature_file:
+                _, tt_font = convert.build_opentype(
+                    infile, feature_file, glyph_filter=glyph_filter, **options
+                )
+
+    postscript_name = rename_part(tt_font, number)
+
+    if to_collection:
+        return convert.font_bytes(tt_font)
+
+    filenames = part_filenames(outfile, postscript_name, number, formats)
+    datas = convert.serialize_formats(tt_font, formats or ["ttf"], format_options)
+    for data, filename in zip(datas, filenames):
+        convert.write_atomic(data, filename)
+
+    return filenames
+
+
+# Convert a BDF font that is too big for one font into several parts, and
+# return the names of the files written. If outfile ends in .ttc, the parts
+# are written into it as a collection; otherwise, each part is named after
+# outfile with its number added, like Unifont.2.ttf. Other options are passed
+# on to convert.build_opentype, and formats and format_options are used as in
+# convert.convert_bdf.
+def split_font(infile_name, outfile=None, feature_file_name=None, formats=None,
+               format_options=None, max_glyphs=MAX_GLYPHS, jobs=None, **options):
+    with open(infile_name, "rb") as infile:
+        convert.font_info(infile)
+        codepoints, unencoded = scan_glyphs(infile)
+
+    # Glyphs the features refer to are kept in every part, and unencoded
+    # glyphs go in the first part, with .notdef.
+    kept = set()
+    if feature_file_name != None:
+        with open(feature_file_name, "r") as feature_file:
+            kept = subset.feature_glyphs(feature_file.read())
+    part_size = max_glyphs - 1 - len(kept | set(unencoded))
+    if part_size < 1:
+        raise ValueError("too many unencoded glyphs to split the font")
+
+    parts = split_by_planes(codepoints, part_size)
+    log.info("splitting %s into %d fonts", infile_name, len(parts))
+
+    to_collection = outfile != None and outfile.lower().endswith(".ttc")
+    if to_collection and formats not in (None, ["ttf"]):
+        raise ValueError("a collection can only hold TrueType fonts")
+
+    arguments = [
+        (infile_name, outfile, feature_file_name, number, part,
+         unencoded if number == 1 else [])
+        for number, part in enumerate(parts, 1)
+    ]
+    part_options = dict(
+        options,
+        to_collection=to_collection,
+        formats=formats,
+        format_options=format_options,
+    )
+
+    with convert.stage("parts"):
+        if jobs == 1 or len(parts) <= 1:
+            results = [build_part(*args, **part_options) for args in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = [pool.submit(build_part, *args, **part_options) for args in arguments]
+                results = [future.result() for future in futures]
+
+    if not to_collection:
+        return [filename for filenames in results for filename in filenames]
+
+    with convert.stage("write collection"):
+        collection = TTCollection()
+        collection.fonts = [TTFont(io.BytesIO(data)) for data in results]
+
+        stream = io.BytesIO()
+        collection.save(stream, shareTables=True)
+        convert.write_atomic(stream.getvalue(), outfile)
+
+    return [outfile]
@@ -0,0 +1,166 @@
+"""
+Convert only part of a bitmap font.
+
+A GlyphFilter decides which glyphs to keep, by codepoint or by name. The
+filter is applied to the lines of the BDF file before bdflib sees them, so
+excluded glyphs are never decoded, outlined or merged: with a 50,000 glyph
+font and a small subset, almost all of the conversion is skipped.
+"""
+
+import io
+import re
+
+from fontTools.feaLib import ast
+from fontTools.feaLib.parser import Parser
+
+
+class GlyphFilter:
+    def __init__(self, unicodes=(), names=()):
+        self.unicodes = set(unicodes)
+        # .notdef is always kept
+        self.names = set(names) | {".notdef"}
+
+
+    # Build a filter from the --unicodes, --text and --glyphs options. Any of
+    # them can be None.
+    @classmethod
+    def from_options(cls, unicodes=None, text=None, glyphs=None):
+        glyph_filter = cls()
+        if unicodes != None:
+            glyph_filter.unicodes |= parse_unicodes(unicodes)
+        if text != None:
+            glyph_filter.unicodes |= {ord(char) for char in text}
+        if glyphs != None:
+            glyph_filter.names |= set(re.split(r"[\s,]+", glyphs.strip())) - {""}
+
+        return glyph_filter
+
+
+    def keeps(self, name, codepoint):
+        return name in self.names or codepoint in self.unicodes
+
+
+    # Return a copy of this filter that also keeps every glyph named in a
+    # feature file, so the features still compile. The feature file is
+    # rewound afterwards.
+    def with_feature_file(self, feature_file):
+        feature_text = feature_file.read()
+        feature_file.seek(0)
+
+        return GlyphFilter(self.unicodes, self.names | feature_glyphs(feature_text))
+
+
+    # A JSON-friendly description, for manifests
+    def describe(self):
+        return {
+            "unicodes": sorted(self.unicodes),
+            "names": sorted(self.names),
+        }
+
+
+# Parse a list of codepoints and ranges, like "U+0020-007E, 2500-257F, U+00A0".
+def parse_unicodes(text):
+    unicodes = set()
+    for item in re.split(r"[\s,]+", text.strip()):
+        if not item:
+            continue
+
+        match = re.fullmatch(r"(?:U\+)?([0-9A-F]+)(?:-(?:U\+)?([0-9A-F]+))?", item, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"bad codepoint or range: {item!r}")
+
+        start = int(match.group(1), 16)
+        end = int(match.group(2), 16) if match.group(2) else start
+        if end < start:
+            raise ValueError(f"bad codepoint range: {item!r}")
+
+        unicodes.update(range(start, end + 1))
+
+    return unicodes
+
+
+# Return the names of every glyph a feature file refers to.
+def feature_glyphs(feature_text):
+    parse_tree = Parser(io.StringIO(feature_text), ()).parse()
+
+    names = set()
+    _collect_glyphs(parse_tree, names, set())
+    return names
+
+
+def _collect_glyphs(node, names, seen):
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            _collect_glyphs(item, names, seen)
+    elif isinstance(node, dict):
+        _collect_glyphs(list(node.keys()), names, seen)
+        _collect_glyphs(list(node.values()), names, seen)
+    elif isinstance(node, ast.Element) and id(node) not in seen:
+        seen.add(id(node))
+
+        # Glyph names, classes and mark classes
+        if hasattr(node, "glyphSet"):
+            names.update(node.glyphSet())
+
+        # Ligature and multiple substitutions keep plain names
+        for field in ("glyph", "replacement"):
+            value = getattr(node, field, None)
+            if isinstance(value, str):
+                names.add(value)
+            elif isinstance(value, (list, tuple)):
+                names.update(name for name in value if isinstance(name, str))
+
+        _collect_glyphs(list(vars(node).values()), names, seen)
+
+
+def _first_field(line):
+    fields = line.split(None, 1)
+    return fields[0] if fields else b""
+
+
+# Yield the lines of a BDF file, leaving out the glyphs glyph_filter doesn't
+# keep. The CHARS line is rewritten with the new glyph count, so the kept
+# glyphs are held in memory until the end of the file; excluded glyphs are
+# skipped as soon as their ENCODING line has been read.
+def subset_lines(lines, glyph_filter):
+    lines = iter(lines)
+
+    for line in lines:
+        if _first_field(line) == b"CHARS":
+            break
+        yield line
+
+    kept = []
+    count = 0
+    glyph = None
+    for line in lines:
+        keyword = _first_field(line)
+
+        if keyword == b"STARTCHAR":
+            name = line.strip()[len(b"STARTCHAR"):].strip().decode()
+            glyph = [line]
+            keep = None
+        elif keyword == b"ENDFONT":
+            break
+        elif glyph == None:
+            continue
+        elif keep == None:
+            glyph.append(line)
+            if keyword == b"ENCODING":
+                codepoint = int(line.split()[1])
+                keep = glyph_filter.keeps(name, codepoint)
+        elif keep:
+            glyph.append(line)
+
+        if keyword == b"ENDCHAR" and glyph != None:
+            if keep == None:
+                # No ENCODING line, so only the name can keep it
+                keep = glyph_filter.keeps(name, None)
+            if keep:
+                kept.extend(glyph)
+                count += 1
+            glyph = None
+
+    yield b"CHARS %d\n" % count
+    yield from kept
+    yield b"ENDFONT\n"
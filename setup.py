@@ -14,11 +14,16 @@ setup(
         long_description_content_type="text/markdown",
         packages=find_packages(),
         install_requires=["bdflib", "pyyaml"],
+        extras_require={
+            "cffsubr": ["cffsubr"],
+            "zopfli": ["zopfli"],
+            },
         python_requires='>=3',
         entry_points={
             "console_scripts": [
                 "bdf2ttf=bdf2ttf.convert:main",
-                "yml2fea=bdf2ttf.feature:main"
+                "yml2fea=bdf2ttf.feature:main",
+                "bdf2ttf-client=bdf2ttf.client:main"
                 ]
             },
         classifiers=[
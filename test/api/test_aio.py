@@ -0,0 +1,88 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.aio import convert_async, convert_bytes_async, convert_many_async
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "{family}"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR double_space
+    ENCODING -1
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+def write_font(directory, family):
+    infile = directory / f"{family}.bdf"
+    infile.write_text(cleandoc(BDF.format(family=family)))
+    return str(infile)
+
+def test_convert_async(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    infile = write_font(tmp_path, "Async")
+    feature_file = tmp_path / "in.fea"
+    feature_file.write_text("feature clig { sub space space by double_space; } clig;")
+
+    font_filename = asyncio.run(convert_async(infile, feature_file=str(feature_file)))
+
+    assert font_filename == "Async-Regular.ttf"
+    font = TTFont(tmp_path / font_filename)
+    assert "GSUB" in font
+
+def test_convert_bytes_async():
+    data = asyncio.run(convert_bytes_async(cleandoc(BDF.format(family="Bytes")).encode()))
+
+    assert TTFont(io.BytesIO(data))["name"].getDebugName(1) == "Bytes"
+
+def test_convert_many_async(tmp_path):
+    infiles = [write_font(tmp_path, family) for family in ["One", "Two", "Three"]]
+    infiles.append(str(tmp_path / "missing.bdf"))
+
+    async def convert_all():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await convert_many_async(infiles, tmp_path / "out", limit=2, executor=executor)
+
+    results = asyncio.run(convert_all())
+
+    assert [error for _, _, error in results[:3]] == [None, None, None]
+    assert results[3][2].startswith("FileNotFoundError")
+    assert TTFont(tmp_path / "out" / "Three.ttf")["name"].getDebugName(1) == "Three"
+
+def test_cancelled_conversions_write_nothing(tmp_path):
+    infiles = [write_font(tmp_path, f"Font{index}") for index in range(20)]
+
+    async def cancel_soon():
+        task = asyncio.ensure_future(convert_many_async(infiles, tmp_path / "out", limit=1))
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(cancel_soon())
+
+    written = list((tmp_path / "out").iterdir())
+    assert len(written) < len(infiles)
+    assert not [path for path in written if path.suffix == ".tmp"]
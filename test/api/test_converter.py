@@ -0,0 +1,90 @@
+import io
+from inspect import cleandoc
+
+import pytest
+
+from fontTools.ttLib import TTFont
+
+import bdf2ttf
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 3 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "{family}"
+    FONT_ASCENT 3
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 1
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 3 0
+    BBX 1 3 1 0
+    BITMAP
+    80
+    80
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def write_fonts(directory, families):
+    infiles = []
+    for family in families:
+        infile = directory / f"{family}.bdf"
+        infile.write_text(cleandoc(BDF.format(family=family)))
+        infiles.append(str(infile))
+
+    return infiles
+
+def test_convert_many_with_threads(tmp_path):
+    infiles = write_fonts(tmp_path, ["One", "Two", "Three"])
+    broken = tmp_path / "Broken.bdf"
+    broken.write_text("STARTFONT 2.1\n")
+    infiles.append(str(broken))
+
+    with bdf2ttf.Converter(max_workers=2) as converter:
+        results = converter.convert_many(infiles, out_dir=tmp_path / "out")
+
+        # Every font shares the same bar glyph, so it is outlined only once
+        assert len(converter.outlines) == 1
+
+    for (infile, font_filename, error), family in zip(results[:3], ["One", "Two", "Three"]):
+        assert error is None
+        assert TTFont(font_filename)["name"].getDebugName(1) == family
+
+    assert results[3][0] == str(broken)
+    assert results[3][1] is None
+    assert results[3][2]
+
+def test_convert_many_with_processes(tmp_path):
+    infiles = write_fonts(tmp_path, ["One", "Two"])
+
+    with bdf2ttf.Converter(executor="process", max_workers=2) as converter:
+        results = converter.convert_many(infiles, out_dir=tmp_path / "out")
+
+    assert [error for _, _, error in results] == [None, None]
+    assert TTFont(tmp_path / "out" / "Two.ttf")["name"].getDebugName(1) == "Two"
+
+def test_convert_bytes():
+    with bdf2ttf.Converter() as converter:
+        converter.convert_bytes(cleandoc(BDF.format(family="One")).encode())
+        data = converter.convert_bytes(cleandoc(BDF.format(family="Two")).encode())
+
+        assert len(converter.outlines) == 1
+
+    font = TTFont(io.BytesIO(data))
+    assert font["name"].getDebugName(1) == "Two"
+    assert font["glyf"]["bar"].numberOfContours == 1
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_submit_bytes(executor):
+    with bdf2ttf.Converter(executor=executor, max_workers=2) as converter:
+        futures = [
+            converter.submit_bytes(cleandoc(BDF.format(family=family)).encode())
+            for family in ["One", "Two"]
+        ]
+        fonts = [TTFont(io.BytesIO(future.result())) for future in futures]
+
+    assert [font["name"].getDebugName(1) for font in fonts] == ["One", "Two"]
@@ -0,0 +1,97 @@
+import io
+import subprocess
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.convert import convert_to_bytes, convert_to_ttfont
+
+BDF = cleandoc("""
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "In Memory"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR double_space
+    ENCODING -1
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """).encode()
+
+FEATURES = """
+    languagesystem DFLT dflt;
+    feature clig {
+        sub space space by double_space;
+    } clig;
+    """
+
+def test_convert_to_ttfont(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    font = convert_to_ttfont(BDF, cleandoc(FEATURES))
+
+    assert font.getGlyphOrder() == [".notdef", "space", "double_space"]
+    assert font["name"].getDebugName(1) == "In Memory"
+    assert "GSUB" in font
+
+    # Nothing was written
+    assert list(tmp_path.iterdir()) == []
+
+def test_convert_to_bytes_from_buffer():
+    data = convert_to_bytes(io.BytesIO(BDF))
+
+    font = TTFont(io.BytesIO(data))
+    assert font["name"].getDebugName(6) == "InMemory-Regular"
+
+def test_write_to_stdout(tmp_path):
+    process = subprocess.run(
+        f"cd {tmp_path}; python -m bdf2ttf.convert - -o -",
+        shell=True,
+        input=BDF,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    font = TTFont(io.BytesIO(process.stdout))
+    assert font["name"].getDebugName(1) == "In Memory"
+    assert list(tmp_path.iterdir()) == []
+
+def test_stdin_with_feature_file(tmp_path):
+    feature_file = tmp_path / "in.fea"
+    feature_file.write_text(cleandoc(FEATURES))
+
+    subprocess.run(
+        f"cd {tmp_path}; python -m bdf2ttf.convert - -f in.fea --unicodes 20 -o out.ttf",
+        shell=True,
+        input=BDF,
+        check=True,
+    )
+
+    font = TTFont(tmp_path / "out.ttf")
+    assert font.getGlyphOrder() == [".notdef", "space", "double_space"]
+    assert "GSUB" in font
+
+def test_feature_file_from_stdin(tmp_path):
+    (tmp_path / "in.bdf").write_bytes(BDF)
+
+    subprocess.run(
+        f"cd {tmp_path}; python -m bdf2ttf.convert in.bdf -f - -o out.ttf",
+        shell=True,
+        input=cleandoc(FEATURES).encode(),
+        check=True,
+    )
+
+    assert "GSUB" in TTFont(tmp_path / "out.ttf")
@@ -0,0 +1,112 @@
+import subprocess
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.batch import expand_inputs
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "{family}"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 1
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+def write_fonts(directory, families):
+    directory.mkdir(parents=True, exist_ok=True)
+    for family in families:
+        (directory / f"{family}.bdf").write_text(cleandoc(BDF.format(family=family)))
+
+def test_expand_inputs(tmp_path):
+    write_fonts(tmp_path / "fonts", ["One", "Two"])
+    write_fonts(tmp_path / "fonts" / "nested", ["Three"])
+    (tmp_path / "fonts" / "README").write_text("not a font")
+
+    assert expand_inputs([str(tmp_path / "fonts")]) == [
+        str(tmp_path / "fonts" / "One.bdf"),
+        str(tmp_path / "fonts" / "Two.bdf"),
+        str(tmp_path / "fonts" / "nested" / "Three.bdf"),
+    ]
+
+    assert expand_inputs([
+        str(tmp_path / "fonts" / "T*.bdf"),
+        str(tmp_path / "fonts" / "Two.bdf"),
+    ]) == [str(tmp_path / "fonts" / "Two.bdf")]
+
+def test_batch_conversion(tmp_path):
+    write_fonts(tmp_path / "fonts", ["One", "Two", "Three"])
+    out_dir = tmp_path / "out"
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert {tmp_path / 'fonts'} --jobs 2 --out-dir {out_dir}",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.returncode == 0
+    assert "3 converted, 0 failed" in process.stderr
+
+    for family in ["One", "Two", "Three"]:
+        font = TTFont(out_dir / f"{family}.ttf")
+        assert font["name"].getDebugName(1) == family
+
+def test_batch_with_failures(tmp_path):
+    write_fonts(tmp_path / "fonts", ["One", "Two"])
+    (tmp_path / "fonts" / "Broken.bdf").write_text("STARTFONT 2.1\n")
+    out_dir = tmp_path / "out"
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert '{tmp_path / 'fonts' / '*.bdf'}' --jobs 2 --out-dir {out_dir}",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.returncode == 1
+    assert "2 converted, 1 failed" in process.stderr
+    assert f"FAILED  {tmp_path / 'fonts' / 'Broken.bdf'}" in process.stderr
+
+    assert sorted(path.name for path in out_dir.iterdir()) == ["One.ttf", "Two.ttf"]
+
+def test_batch_with_same_names(tmp_path):
+    write_fonts(tmp_path / "fonts" / "a", ["One"])
+    write_fonts(tmp_path / "fonts" / "b", ["One"])
+    out_dir = tmp_path / "out"
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert {tmp_path / 'fonts'} --jobs 2 --out-dir {out_dir}",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.returncode == 2
+    assert f"would both be written to {out_dir / 'One.ttf'}" in process.stderr
+    assert not out_dir.exists()
+
+def test_missing_inputs(tmp_path):
+    (tmp_path / "empty").mkdir()
+
+    for inputs in (tmp_path / "missing.bdf", tmp_path / "empty", f"'{tmp_path}/*.bdf'"):
+        process = subprocess.run(
+            f"python -m bdf2ttf.convert {inputs} --out-dir {tmp_path / 'out'}",
+            shell=True,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+        assert process.returncode == 2
+        assert "Traceback" not in process.stderr
@@ -0,0 +1,106 @@
+import pytest
+
+from bdf2ttf import convert
+
+def bdf(size, glyphs):
+    lines = [
+        "STARTFONT 2.1",
+        f"SIZE {size} 72 72",
+        f"FONTBOUNDINGBOX {size} {size} 0 -2",
+        "STARTPROPERTIES 2",
+        f"FONT_ASCENT {size - 2}",
+        "FONT_DESCENT 2",
+        "ENDPROPERTIES",
+        f"CHARS {len(glyphs)}",
+    ]
+    for name, codepoint, bbx, rows in glyphs:
+        lines += [
+            f"STARTCHAR {name}",
+            f"ENCODING {codepoint}",
+            f"DWIDTH {size // 2} 0",
+            f"BBX {bbx}",
+            "BITMAP",
+            *rows,
+            "ENDCHAR",
+        ]
+    lines.append("ENDFONT")
+
+    return "\n".join(lines)
+
+# Three glyphs with their own metrics, then a run of four with the same
+# metrics, which share a fixed-size subtable.
+GLYPHS_8 = [
+    ("space", 32, "0 0 0 0", []),
+    ("exclam", 33, "1 5 1 0", ["80", "80", "80", "00", "80"]),
+    ("quotedbl", 34, "3 2 0 4", ["A0", "A0"]),
+    ("A", 65, "4 6 0 0", ["60", "90", "90", "F0", "90", "90"]),
+    ("B", 66, "4 6 0 0", ["E0", "90", "E0", "90", "90", "E0"]),
+    ("C", 67, "4 6 0 0", ["60", "90", "80", "80", "90", "60"]),
+    ("D", 68, "4 6 0 0", ["E0", "90", "90", "90", "90", "E0"]),
+]
+
+def strike_rows(font, strike_index, name):
+    strike = font["EBLC"].strikes[strike_index]
+    bitmap = font["EBDT"].strikeData[strike_index][name]
+
+    for subtable in strike.indexSubTables:
+        if name in subtable.names:
+            metrics = getattr(bitmap, "metrics", None) or subtable.metrics
+            return [bitmap.getRow(row, metrics=metrics).hex().upper()
+                    for row in range(metrics.height)]
+
+def test_native_strike(convert_str):
+    font = convert_str(bdf(8, GLYPHS_8), extra_args="--bitmaps")
+
+    (strike,) = font["EBLC"].strikes
+    assert strike.bitmapSizeTable.ppemY == 8
+    assert [
+        (subtable.indexFormat, subtable.imageFormat, subtable.names)
+        for subtable in strike.indexSubTables
+    ] == [
+        (3, 2, ["space", "exclam", "quotedbl"]),
+        (2, 5, ["A", "B", "C", "D"]),
+    ]
+
+    assert strike_rows(font, 0, "exclam") == ["80", "80", "80", "00", "80"]
+    assert strike_rows(font, 0, "C") == ["60", "90", "80", "80", "90", "60"]
+
+    metrics = font["EBDT"].strikeData[0]["quotedbl"].metrics
+    assert (metrics.width, metrics.height, metrics.BearingX, metrics.BearingY) == (3, 2, 0, 6)
+    assert metrics.Advance == 4
+
+def test_no_strikes_by_default(convert_str):
+    font = convert_str(bdf(8, GLYPHS_8))
+
+    assert "EBLC" not in font
+    assert "EBDT" not in font
+
+def test_extra_strike(convert_str, tmp_path):
+    # Matched by codepoint, since the name differs
+    glyphs_16 = [
+        ("exclam", 33, "2 10 3 0", ["C0"] * 7 + ["00", "C0", "C0"]),
+        ("uni0041", 65, "8 12 0 0", ["3C"] + ["C3"] * 11),
+        # Not in the main font, so left out
+        ("Z", 90, "8 12 0 0", ["FF"] * 12),
+    ]
+    extra = tmp_path / "extra.bdf"
+    extra.write_text(bdf(16, glyphs_16))
+
+    font = convert_str(bdf(8, GLYPHS_8), extra_args=f"--bitmap-strike {extra}")
+
+    strikes = font["EBLC"].strikes
+    assert [strike.bitmapSizeTable.ppemY for strike in strikes] == [8, 16]
+    assert sorted(font["EBDT"].strikeData[1]) == ["A", "exclam"]
+    assert strike_rows(font, 1, "A") == ["3C"] + ["C3"] * 11
+    assert strikes[1].bitmapSizeTable.hori.ascender == 14
+
+def test_same_size_strike(tmp_path):
+    in_file = tmp_path / "in.bdf"
+    in_file.write_text(bdf(8, GLYPHS_8))
+
+    with pytest.raises(ValueError):
+        convert.convert_bdf_file(
+            str(in_file),
+            str(tmp_path / "out.ttf"),
+            bitmap_strikes=[str(in_file)],
+        )
@@ -0,0 +1,110 @@
+import subprocess
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 4
+    FAMILY_NAME "Family"
+    WEIGHT_NAME "{weight}"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 3
+    STARTCHAR equal
+    ENCODING 61
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR LIG
+    ENCODING -1
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR equal_equal.liga
+    ENCODING -1
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+MANIFEST = """
+    features:
+      - source: ligatures.yml
+        output: build/ligatures.fea
+    fonts:
+      - source: Regular.bdf
+        output: build/Family-Regular.ttf
+        feature_file: build/ligatures.fea
+      - source: Bold.bdf
+        output: build/Family-Bold.ttf
+        feature_file: build/ligatures.fea
+    """
+
+def build(manifest_file):
+    return subprocess.run(
+        f"python -m bdf2ttf.convert build {manifest_file} --jobs 2",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+def write_project(tmp_path):
+    (tmp_path / "Regular.bdf").write_text(cleandoc(BDF.format(weight="Regular")))
+    (tmp_path / "Bold.bdf").write_text(cleandoc(BDF.format(weight="Bold")))
+    (tmp_path / "ligatures.yml").write_text("ligatures:\n  - equal equal\n")
+    (tmp_path / "manifest.yml").write_text(cleandoc(MANIFEST))
+
+def test_build_manifest(tmp_path):
+    write_project(tmp_path)
+
+    process = build(tmp_path / "manifest.yml")
+    assert process.returncode == 0, process.stderr
+    assert "3 built, 0 up to date, 0 failed, 0 skipped" in process.stderr
+
+    for style in ["Regular", "Bold"]:
+        font = TTFont(tmp_path / "build" / f"Family-{style}.ttf")
+        assert font["name"].getDebugName(2) == style
+        assert font["GSUB"].table.FeatureList.FeatureRecord[0].FeatureTag == "clig"
+
+def test_unchanged_nodes_are_skipped(tmp_path):
+    write_project(tmp_path)
+    build(tmp_path / "manifest.yml")
+
+    process = build(tmp_path / "manifest.yml")
+    assert process.returncode == 0, process.stderr
+    assert "0 built, 3 up to date, 0 failed, 0 skipped" in process.stderr
+
+    (tmp_path / "Bold.bdf").write_text(cleandoc(BDF.format(weight="Black")))
+    process = build(tmp_path / "manifest.yml")
+    assert "1 built, 2 up to date, 0 failed, 0 skipped" in process.stderr
+
+def test_failed_dependencies_skip_fonts(tmp_path):
+    write_project(tmp_path)
+    (tmp_path / "ligatures.yml").unlink()
+
+    process = build(tmp_path / "manifest.yml")
+    assert process.returncode == 1
+    assert "0 built, 0 up to date, 1 failed, 2 skipped" in process.stderr
+
+def test_formats(tmp_path):
+    write_project(tmp_path)
+    manifest = cleandoc(MANIFEST) + "\n    formats: ttf,woff\n"
+    (tmp_path / "manifest.yml").write_text(manifest)
+
+    process = build(tmp_path / "manifest.yml")
+    assert process.returncode == 0, process.stderr
+    assert "3 built, 0 up to date, 0 failed, 0 skipped" in process.stderr
+
+    assert (tmp_path / "build" / "Family-Bold.woff").exists()
+    assert not (tmp_path / "build" / "Family-Regular.woff").exists()
+
+    process = build(tmp_path / "manifest.yml")
+    assert "0 built, 3 up to date, 0 failed, 0 skipped" in process.stderr
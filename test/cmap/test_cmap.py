@@ -0,0 +1,104 @@
+import io
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.cmap import variation_sequence
+from bdf2ttf.convert import convert_to_ttfont
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 2 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 2
+    FONT_ASCENT 2
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 5
+    STARTCHAR zero
+    ENCODING 48
+    DWIDTH 2 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR one
+    ENCODING 49
+    DWIDTH 2 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR u20000
+    ENCODING 131072
+    DWIDTH 2 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR u20001
+    ENCODING 131073
+    DWIDTH 2 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR uni0030_uniFE00
+    ENCODING -1
+    DWIDTH 2 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+def test_variation_sequence():
+    assert variation_sequence("uni8FBB_uE0100") == (0x8FBB, 0xE0100)
+    assert variation_sequence("u1F600_uFE0F") == (0x1F600, 0xFE0F)
+    assert variation_sequence("f_i") == None
+    assert variation_sequence("zero.alt") == None
+
+def test_subtables(convert_str):
+    font = convert_str(BDF)
+
+    subtables = {
+        (subtable.platformID, subtable.platEncID): subtable
+        for subtable in font["cmap"].tables
+    }
+    assert {key: subtable.format for key, subtable in subtables.items()} == {
+        (0, 3): 4,
+        (3, 1): 4,
+        (3, 10): 12,
+        (0, 5): 14,
+    }
+
+    # Format 4 holds the BMP only
+    assert subtables[3, 1].cmap == {48: "zero", 49: "one"}
+    assert subtables[3, 10].cmap == {
+        48: "zero",
+        49: "one",
+        0x20000: "u20000",
+        0x20001: "u20001",
+    }
+    assert subtables[3, 10].nGroups == 2
+
+    assert subtables[0, 5].uvsDict == {0xFE00: [(48, "uni0030_uniFE00")]}
+
+def test_edited_after_conversion():
+    font = convert_to_ttfont(cleandoc(BDF).encode())
+    for subtable in font["cmap"].tables:
+        if subtable.format != 14:
+            subtable.cmap[49] = "zero"
+
+    stream = io.BytesIO()
+    font.save(stream)
+    saved = TTFont(stream)
+
+    assert saved["cmap"].getcmap(3, 1).cmap == {48: "zero", 49: "zero"}
+    assert saved["cmap"].getcmap(3, 10).cmap[49] == "zero"
+
+def test_empty_bmp(convert_str):
+    # Only the glyphs beyond the BMP
+    glyphs = cleandoc(BDF).split("STARTCHAR ")
+    bdf = "STARTCHAR ".join([glyphs[0].replace("CHARS 5", "CHARS 2"), glyphs[3], glyphs[4]])
+    font = convert_str(bdf + "ENDFONT\n")
+
+    assert font["cmap"].getcmap(3, 1).cmap == {}
+    assert font["cmap"].getcmap(0, 3).cmap == {}
+    assert font["cmap"].getcmap(3, 10).cmap == {0x20000: "u20000", 0x20001: "u20001"}
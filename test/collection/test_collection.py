@@ -0,0 +1,125 @@
+import subprocess
+from inspect import cleandoc
+
+from fontTools.ttLib import TTCollection
+
+from bdf2ttf.collection import build_collection
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 8 72 72
+    FONTBOUNDINGBOX 4 8 0 -1
+    STARTPROPERTIES 4
+    FAMILY_NAME "Family"
+    WEIGHT_NAME "{weight}"
+    FONT_ASCENT 7
+    FONT_DESCENT 1
+    ENDPROPERTIES
+    CHARS 3
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 4 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 4 0
+    BBX {bar_width} 3 1 0
+    BITMAP
+    {bar}
+    {bar}
+    {bar}
+    ENDCHAR
+    STARTCHAR bar.alt
+    ENCODING -1
+    DWIDTH 4 0
+    BBX 1 1 1 0
+    BITMAP
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+FEATURES = """
+    languagesystem DFLT dflt;
+    feature ss01 {
+        sub bar by bar.alt;
+    } ss01;
+    """
+
+def write_family(directory):
+    regular = directory / "Regular.bdf"
+    bold = directory / "Bold.bdf"
+    regular.write_text(cleandoc(BDF.format(weight="Medium", bar_width=1, bar="80")))
+    bold.write_text(cleandoc(BDF.format(weight="Bold", bar_width=2, bar="C0")))
+
+    return [str(regular), str(bold)]
+
+def test_collection(tmp_path):
+    infiles = write_family(tmp_path)
+    feature_file = tmp_path / "features.fea"
+    feature_file.write_text(cleandoc(FEATURES))
+    outfile = tmp_path / "family.ttc"
+
+    summary = build_collection(infiles, str(outfile), feature_file_name=str(feature_file), jobs=2)
+
+    # .notdef, space and bar.alt are shared
+    assert (summary["glyphs"], summary["separate_glyphs"]) == (5, 8)
+
+    regular, bold = TTCollection(str(outfile)).fonts
+    assert regular["name"].getDebugName(4) == "Family"
+    assert bold["name"].getDebugName(4) == "Family Bold"
+    assert regular.getGlyphOrder() == bold.getGlyphOrder()
+
+    assert regular.getBestCmap()[124] == "bar"
+    assert bold.getBestCmap()[124] == "bar.m1"
+    assert regular.getBestCmap()[32] == bold.getBestCmap()[32] == "space"
+
+    for font, bar in ((regular, "bar"), (bold, "bar.m1")):
+        lookup = font["GSUB"].table.LookupList.Lookup[0]
+        assert lookup.SubTable[0].mapping == {bar: "bar.alt"}
+
+    # Both members use the same glyph data
+    assert regular.reader.tables["glyf"].offset == bold.reader.tables["glyf"].offset
+    assert regular.reader.tables["hmtx"].offset == bold.reader.tables["hmtx"].offset
+
+def test_variation_sequences(tmp_path):
+    sequence = cleandoc("""
+        STARTCHAR uni007C_uniFE00
+        ENCODING -1
+        DWIDTH 4 0
+        BBX {bar_width} 2 1 0
+        BITMAP
+        {bar}
+        {bar}
+        ENDCHAR
+        ENDFONT
+        """)
+    infiles = []
+    for weight, bar_width, bar in (("Medium", 1, "80"), ("Bold", 2, "C0")):
+        bdf = cleandoc(BDF).replace("CHARS 3", "CHARS 4").replace("ENDFONT", sequence)
+        infile = tmp_path / f"{weight}.bdf"
+        infile.write_text(bdf.format(weight=weight, bar_width=bar_width, bar=bar))
+        infiles.append(str(infile))
+
+    outfile = tmp_path / "family.ttc"
+    build_collection(infiles, str(outfile), jobs=1)
+
+    regular, bold = TTCollection(str(outfile)).fonts
+    for font, name in ((regular, "uni007C_uniFE00"), (bold, "uni007C_uniFE00.m1")):
+        assert font["cmap"].getcmap(0, 5).uvsDict == {0xFE00: [(0x7C, name)]}
+
+def test_collection_command(tmp_path):
+    infiles = write_family(tmp_path)
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert collection -o {tmp_path / 'family.ttc'} {' '.join(infiles)}",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.returncode == 0
+    assert "2 fonts" in process.stderr
+    assert len(TTCollection(str(tmp_path / "family.ttc")).fonts) == 2
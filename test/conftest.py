@@ -8,7 +8,7 @@ from fontTools.ttLib.ttFont import TTFont
 # convert is a fixture that returns a function for converting BDF files.
 @pytest.fixture
 def convert(tmp_path, capfd):
-    def _convert(filename, feature_filename=None):
+    def _convert(filename, feature_filename=None, extra_args=""):
         out_file = tmp_path / "converted_file.ttf"
 
         command = f"python -m bdf2ttf.convert {filename} -o {out_file}"
@@ -16,6 +16,9 @@ def convert(tmp_path, capfd):
         if feature_filename:
             command += f" -f {feature_filename}"
 
+        if extra_args:
+            command += f" {extra_args}"
+
         process = subprocess.run(
             command,
             shell=True,
@@ -35,7 +38,7 @@ def convert(tmp_path, capfd):
 # convert_str is the same as convert, but takes the contents of a file as a string.
 @pytest.fixture
 def convert_str(tmp_path, convert):
-    def _convert_str(bdf_contents, feature_contents=None):
+    def _convert_str(bdf_contents, feature_contents=None, extra_args=""):
         in_file = tmp_path / "in_file.bdf"
         in_file.write_text(cleandoc(bdf_contents))
 
@@ -44,6 +47,6 @@ def convert_str(tmp_path, convert):
             feature_file = tmp_path / "in.fea"
             feature_file.write_text(cleandoc(feature_contents))
 
-        return convert(in_file, feature_file)
+        return convert(in_file, feature_file, extra_args)
 
     return _convert_str
@@ -0,0 +1,107 @@
+import io
+import subprocess
+from inspect import cleandoc
+
+import pytest
+
+from fontTools.ttLib import TTFont, newTable
+
+from bdf2ttf.feature_cache import FeatureCache
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 2
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR double_space
+    ENCODING -1
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+FEATURES = """
+    languagesystem DFLT dflt;
+    feature clig {
+        lookup double_space {
+          sub space space by double_space;
+        } double_space;
+    } clig;
+    """
+
+def assert_double_space_ligature(font):
+    lookup = font["GSUB"].table.LookupList.Lookup[0]
+    ligature = lookup.SubTable[0].ligatures["space"][0]
+    assert ligature.LigGlyph == "double_space"
+    assert ligature.Component == ["space"]
+
+def test_disk_cache_is_reused(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+    feature_file = tmp_path / "in.fea"
+    feature_file.write_text(cleandoc(FEATURES))
+    cache_dir = tmp_path / "cache"
+
+    for out_name in ["first.ttf", "second.ttf"]:
+        process = subprocess.run(
+            f"python -m bdf2ttf.convert {in_file} -o {tmp_path / out_name} "
+            f"-f {feature_file} --feature-cache {cache_dir}",
+            shell=True,
+            stderr=subprocess.STDOUT,
+        )
+        if process.returncode:
+            pytest.fail("failed to convert")
+
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    assert_double_space_ligature(TTFont(tmp_path / "first.ttf"))
+    assert_double_space_ligature(TTFont(tmp_path / "second.ttf"))
+
+def make_font():
+    font = TTFont()
+    font.setGlyphOrder([".notdef", "space", "double_space"])
+    return font
+
+def test_memory_cache_is_reused():
+    cache = FeatureCache()
+
+    first = make_font()
+    cache.add_features(first, io.StringIO(cleandoc(FEATURES)))
+    second = make_font()
+    cache.add_features(second, io.StringIO(cleandoc(FEATURES)))
+
+    assert len(cache._tables) == 1
+    assert len(cache._parse_trees) == 1
+    assert_double_space_ligature(first)
+    assert_double_space_ligature(second)
+
+def test_name_table_features_are_not_cached():
+    cache = FeatureCache()
+    font = make_font()
+    font["name"] = newTable("name")
+    font["name"].names = []
+
+    cache.add_features(font, io.StringIO(cleandoc("""
+        languagesystem DFLT dflt;
+        feature ss01 {
+            featureNames {
+                name "Double spaces";
+            };
+            sub space by double_space;
+        } ss01;
+        """)))
+
+    assert len(cache._tables) == 0
+    assert font["name"].getDebugName(256) == "Double spaces"
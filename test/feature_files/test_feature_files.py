@@ -74,3 +74,83 @@ def test_with_clig_basic_sub_feature_file(convert_str):
     ligature = lookup.SubTable[0].ligatures["space"][0]
     assert ligature.LigGlyph == "double_space"
     assert ligature.Component == ["space"]
+
+def test_with_feature_names(convert_str):
+    font = convert_str("""
+        STARTFONT 2.1
+        SIZE 1 72 72
+        FONTBOUNDINGBOX 0 0 0 0
+        STARTPROPERTIES 2
+        FONT_ASCENT 1
+        FONT_DESCENT 0
+        ENDPROPERTIES
+        CHARS 2
+        STARTCHAR space
+        ENCODING 32
+        DWIDTH 1 0
+        BBX 0 0 0 0
+        BITMAP
+        ENDCHAR
+        STARTCHAR space.alt
+        ENCODING -1
+        DWIDTH 1 0
+        BBX 0 0 0 0
+        BITMAP
+        ENDCHAR
+        ENDFONT
+        """, """
+        languagesystem DFLT dflt;
+        feature ss01 {
+            featureNames {
+                name "Alternate space";
+            };
+            sub space by space.alt;
+        } ss01;
+        """)
+
+    assert font["name"].getDebugName(256) == "Alternate space"
+    assert font["name"].getDebugName(1) == "Unknown"
+
+    featureRecord = font["GSUB"].table.FeatureList.FeatureRecord[0]
+    assert featureRecord.FeatureTag == "ss01"
+    assert featureRecord.Feature.FeatureParams.UINameID == 256
+
+def test_without_glyph_names(convert_str):
+    font = convert_str("""
+        STARTFONT 2.1
+        SIZE 1 72 72
+        FONTBOUNDINGBOX 0 0 0 0
+        STARTPROPERTIES 2
+        FONT_ASCENT 1
+        FONT_DESCENT 0
+        ENDPROPERTIES
+        CHARS 2
+        STARTCHAR space
+        ENCODING 32
+        DWIDTH 1 0
+        BBX 0 0 0 0
+        BITMAP
+        ENDCHAR
+        STARTCHAR space.alt
+        ENCODING -1
+        DWIDTH 1 0
+        BBX 0 0 0 0
+        BITMAP
+        ENDCHAR
+        ENDFONT
+        """, """
+        languagesystem DFLT dflt;
+        feature ss01 {
+            sub space by space.alt;
+        } ss01;
+        """, extra_args="--post-format 3")
+
+    assert font["post"].formatType == 3.0
+    assert "space.alt" not in font.getGlyphOrder()
+
+    # The substitution still points at the unnamed glyph
+    lookup = font["GSUB"].table.LookupList.Lookup[0]
+    (mapping,) = [subtable.mapping for subtable in lookup.SubTable]
+    (source, target) = mapping.popitem()
+    assert font.getGlyphID(source) == 1
+    assert font.getGlyphID(target) == 2
@@ -0,0 +1,270 @@
+import subprocess
+from inspect import cleandoc
+
+import pytest
+
+from fontTools.pens.boundsPen import BoundsPen
+from fontTools.ttLib import TTFont
+
+from bdf2ttf import formats
+from bdf2ttf.convert import convert_bdf_file
+from bdf2ttf.formats import output_filenames, parse_formats
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 8 72 72
+    FONTBOUNDINGBOX 4 8 0 -1
+    STARTPROPERTIES 3
+    FAMILY_NAME "Formats"
+    FONT_ASCENT 7
+    FONT_DESCENT 1
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 4 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 4 0
+    BBX 1 3 1 0
+    BITMAP
+    80
+    80
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def test_parse_formats():
+    assert parse_formats(["ttf,otf", "WOFF", "ttf"]) == ["ttf", "otf", "woff"]
+
+    with pytest.raises(ValueError):
+        parse_formats(["ttf,svg"])
+
+def test_output_filenames():
+    assert output_filenames(None, "Font-Regular", ["ttf", "woff"]) == [
+        "Font-Regular.ttf",
+        "Font-Regular.woff",
+    ]
+    assert output_filenames("out/font.woff", "Font-Regular", ["ttf", "woff"]) == [
+        "out/font.ttf",
+        "out/font.woff",
+    ]
+    assert output_filenames("font.ttf", "Font-Regular", ["otf"]) == ["font.otf"]
+    assert output_filenames("font.bin", "Font-Regular", ["otf"]) == ["font.bin"]
+
+def test_all_formats(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert {in_file} -o {tmp_path / 'out.ttf'} --format ttf,otf --format woff",
+        shell=True,
+        stderr=subprocess.STDOUT,
+    )
+    assert process.returncode == 0
+
+    ttf = TTFont(tmp_path / "out.ttf")
+    otf = TTFont(tmp_path / "out.otf")
+    woff = TTFont(tmp_path / "out.woff")
+
+    assert "glyf" in ttf
+    assert otf.sfntVersion == "OTTO"
+    assert "CFF " in otf and "glyf" not in otf
+    assert woff.flavor == "woff"
+
+    for font in (otf, woff):
+        assert font.getGlyphOrder() == ttf.getGlyphOrder()
+        assert font["hmtx"].metrics == ttf["hmtx"].metrics
+        assert font.getBestCmap() == ttf.getBestCmap()
+
+    assert glyph_bounds(otf, "bar") == glyph_bounds(ttf, "bar")
+
+def glyph_bounds(font, name):
+    glyph_set = font.getGlyphSet()
+    pen = BoundsPen(glyph_set)
+    glyph_set[name].draw(pen)
+    return pen.bounds
+
+def test_formats_with_manifest(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+    manifest_file = tmp_path / "manifest.json"
+    out_file = tmp_path / "out.ttf"
+
+    options = {"manifest_file": str(manifest_file), "formats": ["ttf", "woff"]}
+    assert convert_bdf_file(str(in_file), str(out_file), **options) == [
+        str(out_file),
+        str(tmp_path / "out.woff"),
+    ]
+    first_mtime = (tmp_path / "out.woff").stat().st_mtime_ns
+
+    assert convert_bdf_file(str(in_file), str(out_file), **options) == [
+        str(out_file),
+        str(tmp_path / "out.woff"),
+    ]
+    assert (tmp_path / "out.woff").stat().st_mtime_ns == first_mtime
+
+    # A missing output means converting again
+    (tmp_path / "out.woff").unlink()
+    convert_bdf_file(str(in_file), str(out_file), **options)
+    assert (tmp_path / "out.woff").exists()
+
+@pytest.mark.parametrize("cff_version", [1, 2])
+def test_cff_versions(tmp_path, cff_version):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+    ttf_file, otf_file = convert_bdf_file(
+        str(in_file),
+        str(tmp_path / "out.otf"),
+        formats=["ttf", "otf"],
+        format_options={"otf": {"cff_version": cff_version, "subroutinize": False}},
+    )
+
+    ttf = TTFont(ttf_file)
+    otf = TTFont(otf_file)
+
+    tag = "CFF2" if cff_version == 2 else "CFF "
+    assert tag in otf
+    assert otf["hmtx"].metrics == ttf["hmtx"].metrics
+    assert glyph_bounds(otf, "bar") == glyph_bounds(ttf, "bar")
+
+def test_cff_default_width(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+    # Subroutinizing rewrites the widths in its own way
+    (otf_file,) = convert_bdf_file(
+        str(in_file),
+        str(tmp_path / "out.otf"),
+        formats=["otf"],
+        format_options={"otf": {"subroutinize": False}},
+    )
+
+    otf = TTFont(otf_file)
+    cff = otf["CFF "].cff.topDictIndex[0]
+    advance = otf["hmtx"]["bar"][0]
+    assert cff.Private.defaultWidthX == advance
+
+    # Glyphs with the default width don't store it
+    charstring = cff.CharStrings["bar"]
+    charstring.decompile()
+    assert advance not in charstring.program
+
+def test_subroutinize(tmp_path):
+    pytest.importorskip("cffsubr")
+
+    # Many glyphs with the same outline, which share a subroutine
+    glyphs = "".join(
+        f"STARTCHAR g{codepoint}\nENCODING {codepoint}\nDWIDTH 4 0\nBBX 3 3 0 0\n"
+        "BITMAP\nE0\nA0\nE0\nENDCHAR\n"
+        for codepoint in range(65, 91)
+    )
+    bdf = cleandoc(BDF).replace("CHARS 2", "CHARS 28").replace("ENDFONT", glyphs + "ENDFONT")
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(bdf)
+
+    sizes = []
+    for subroutinize in (False, True):
+        (otf_file,) = convert_bdf_file(
+            str(in_file),
+            str(tmp_path / f"{subroutinize}.otf"),
+            formats=["otf"],
+            format_options={"otf": {"subroutinize": subroutinize}},
+        )
+        sizes.append(len(TTFont(otf_file).reader["CFF "]))
+
+    otf = TTFont(otf_file)
+    assert len(otf["CFF "].cff.topDictIndex[0].Private.Subrs) > 0
+    assert glyph_bounds(otf, "g65") == (0, 0, 384, 384)
+    assert sizes[1] < sizes[0]
+
+def test_subroutinize_without_cffsubr(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(formats, "cffsubr", None)
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    convert_bdf_file(str(in_file), str(tmp_path / "out.otf"), formats=["otf"])
+
+    assert "cffsubr is not installed" in caplog.text
+    assert caplog.records[-1].levelname == "WARNING"
+
+@pytest.mark.parametrize("level", [0, 1, 9])
+def test_woff_levels(tmp_path, level):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+    ttf_file, woff_file = convert_bdf_file(
+        str(in_file),
+        str(tmp_path / "out.ttf"),
+        formats=["ttf", "woff"],
+        format_options={"woff": {"level": level}},
+    )
+
+    ttf = TTFont(ttf_file)
+    woff = TTFont(woff_file, checkChecksums=2)
+    assert woff.flavor == "woff"
+
+    for tag in ttf.reader.keys():
+        entry = woff.reader.tables[tag]
+        if level == 0:
+            assert entry.length == entry.origLength
+        assert woff.reader[tag] == ttf.reader[tag]
+
+def test_woff_tables_in_parallel(tmp_path, monkeypatch):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+    (ttf_file,) = convert_bdf_file(str(in_file), str(tmp_path / "out.ttf"), formats=["ttf"])
+    ttf_data = (tmp_path / "out.ttf").read_bytes()
+
+    serial = formats.to_woff(ttf_data)
+    monkeypatch.setattr(formats, "PARALLEL_WOFF_SIZE", 0)
+    assert formats.to_woff(ttf_data) == serial
+
+def test_zopfli(tmp_path):
+    pytest.importorskip("zopfli")
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    ttf_file, woff_file = convert_bdf_file(
+        str(in_file),
+        str(tmp_path / "out.ttf"),
+        formats=["ttf", "woff"],
+        format_options={"woff": {"zopfli": True}},
+    )
+
+    ttf = TTFont(ttf_file)
+    woff = TTFont(woff_file, checkChecksums=2)
+    for tag in ttf.reader.keys():
+        assert woff.reader[tag] == ttf.reader[tag]
+
+def test_zopfli_without_zopfli(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(formats, "zopfli_zlib", None)
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    convert_bdf_file(
+        str(in_file),
+        str(tmp_path / "out.woff"),
+        formats=["woff"],
+        format_options={"woff": {"zopfli": True}},
+    )
+
+    assert "zopfli is not installed" in caplog.text
+    assert caplog.records[-1].levelname == "WARNING"
+
+@pytest.mark.skipif(formats.zopfli_zlib != None, reason="zopfli is installed")
+def test_zopfli_option_without_zopfli(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert {in_file} -o {tmp_path / 'out.woff'} --format woff --zopfli",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.returncode == 2
+    assert "--zopfli needs the zopfli package" in process.stderr
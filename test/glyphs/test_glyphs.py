@@ -209,3 +209,81 @@ def test_provided_notdef_glyph(convert_str):
         ('lineTo', ((pixel*2, 0),)),
         ('closePath', ())
     ]
+
+def test_optimized_glyph_order(convert_str):
+    glyphs = [
+        ("b", 98, 3),
+        ("a.alt", -1, 3),
+        ("wide", 0x3000, 6),
+        ("a", 97, 3),
+        ("c", 99, 3),
+    ]
+    bdf = """
+        STARTFONT 2.1
+        FONT --------------
+        SIZE 3 72 72
+        FONTBOUNDINGBOX 0 0 0 0
+        STARTPROPERTIES 3
+        FONT_ASCENT 3
+        FONT_DESCENT 0
+        SPACING "C"
+        ENDPROPERTIES
+        CHARS 5
+        """
+    for name, codepoint, width in glyphs:
+        bdf += f"""
+        STARTCHAR {name}
+        ENCODING {codepoint}
+        DWIDTH {width} 0
+        BBX 0 0 0 0
+        BITMAP
+        ENDCHAR"""
+    bdf += """
+        ENDFONT
+        """
+
+    font = convert_str(bdf, extra_args="--optimize-order")
+
+    # .notdef, then the odd width, then the common width by codepoint
+    assert font.getGlyphOrder() == [".notdef", "wide", "a", "b", "c", "a.alt"]
+    assert font["hhea"].numberOfHMetrics == 3
+    assert font["cmap"].getBestCmap()[98] == "b"
+
+def test_ranked_glyph_order(convert_str, tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("cab c\ncb", encoding="utf-8")
+
+    bdf = """
+        STARTFONT 2.1
+        FONT --------------
+        SIZE 3 72 72
+        FONTBOUNDINGBOX 0 0 0 0
+        STARTPROPERTIES 2
+        FONT_ASCENT 3
+        FONT_DESCENT 0
+        ENDPROPERTIES
+        CHARS 4
+        """
+    for name, codepoint in [("a", 97), ("b", 98), ("c", 99), ("c.alt", -1)]:
+        bdf += f"""
+        STARTCHAR {name}
+        ENCODING {codepoint}
+        DWIDTH 3 0
+        BBX 0 0 0 0
+        BITMAP
+        ENDCHAR"""
+    bdf += """
+        ENDFONT
+        """
+
+    font = convert_str(bdf, """
+        languagesystem DFLT dflt;
+        feature ss01 {
+            sub c by c.alt;
+        } ss01;
+        """, extra_args=f"--ranking {corpus}")
+
+    assert font.getGlyphOrder() == [".notdef", "c", "b", "a", "c.alt"]
+
+    lookup = font["GSUB"].table.LookupList.Lookup[0]
+    assert lookup.SubTable[0].mapping == {"c": "c.alt"}
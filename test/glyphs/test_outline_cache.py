@@ -0,0 +1,79 @@
+import io
+from inspect import cleandoc
+
+from fontTools.pens.recordingPen import RecordingPen
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.convert import convert_bdf
+
+BDF = """
+    STARTFONT 2.1
+    FONT --------------
+    SIZE 3 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 2
+    FONT_ASCENT 3
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR L
+    ENCODING 76
+    DWIDTH 3 0
+    BBX 2 3 0 0
+    BITMAP
+    80
+    80
+    C0
+    ENDCHAR
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 3 0
+    BBX 1 3 1 0
+    BITMAP
+    {bar_row}
+    80
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def convert(tmp_path, name, bar_row, outline_cache):
+    bdf = io.BytesIO(cleandoc(BDF.format(bar_row=bar_row)).encode())
+    out_file = tmp_path / name
+    convert_bdf(bdf, out_file, outline_cache=outline_cache)
+
+    return TTFont(out_file)
+
+def drawing(font, name):
+    pen = RecordingPen()
+    font.getGlyphSet()[name].draw(pen)
+    return pen.value
+
+def test_cached_outlines_match_uncached(tmp_path):
+    uncached = convert(tmp_path, "uncached.ttf", "80", None)
+
+    outline_cache = {}
+    first = convert(tmp_path, "first.ttf", "80", outline_cache)
+    assert len(outline_cache) == 2
+
+    second = convert(tmp_path, "second.ttf", "80", outline_cache)
+
+    for name in ["L", "bar"]:
+        assert drawing(first, name) == drawing(uncached, name)
+        assert drawing(second, name) == drawing(uncached, name)
+        assert second["hmtx"][name] == uncached["hmtx"][name]
+
+def test_changed_glyphs_are_rebuilt(tmp_path):
+    outline_cache = {}
+    convert(tmp_path, "first.ttf", "80", outline_cache)
+    changed = convert(tmp_path, "second.ttf", "00", outline_cache)
+
+    # Only the changed bar glyph adds a new entry
+    assert len(outline_cache) == 3
+    assert drawing(changed, "bar") == [
+        ('moveTo', ((341, 0),)),
+        ('lineTo', ((341, 682),)),
+        ('lineTo', ((682, 682),)),
+        ('lineTo', ((682, 0),)),
+        ('closePath', ())
+    ]
@@ -0,0 +1,112 @@
+import sqlite3
+import subprocess
+from inspect import cleandoc
+
+from bdf2ttf.index import update_index
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 8 72 72
+    FONTBOUNDINGBOX 4 8 0 -1
+    STARTPROPERTIES 4
+    FAMILY_NAME "{family}"
+    WEIGHT_NAME "{weight}"
+    FONT_ASCENT 7
+    FONT_DESCENT 1
+    ENDPROPERTIES
+    CHARS 3
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 4 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 4 0
+    BBX 1 3 1 0
+    BITMAP
+    {bar}
+    80
+    80
+    ENDCHAR
+    STARTCHAR bar.alt
+    ENCODING -1
+    DWIDTH 4 0
+    BBX 1 3 1 0
+    BITMAP
+    80
+    80
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def write_font(path, family="Test", weight="Medium", bar="80"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(cleandoc(BDF.format(family=family, weight=weight, bar=bar)))
+
+def query(database, sql):
+    with sqlite3.connect(database) as db:
+        return db.execute(sql).fetchall()
+
+def test_index(tmp_path):
+    fonts = tmp_path / "fonts"
+    database = tmp_path / "index.sqlite"
+    write_font(fonts / "regular.bdf")
+    # Same glyph with padding in its bitmap rows
+    write_font(fonts / "bold" / "bold.bdf", weight="Bold", bar="8000")
+
+    summary = update_index(str(fonts), str(database), jobs=2)
+
+    assert summary["indexed"] == 2
+    assert summary["glyphs"] == 6
+    assert summary["distinct_bitmaps"] == 2
+    assert summary["duplicate_glyphs"] == 4
+    assert summary["shared_bitmaps"] == 2
+
+    assert query(database, "SELECT path, family, style, pixel_size, glyph_count FROM fonts ORDER BY path") == [
+        ("bold/bold.bdf", "Test", "Bold", 8, 3),
+        ("regular.bdf", "Test", "Regular", 8, 3),
+    ]
+    assert query(database, """
+        SELECT DISTINCT name, codepoint FROM glyphs ORDER BY name
+        """) == [("bar", 124), ("bar.alt", None), ("space", 32)]
+
+def test_refresh(tmp_path):
+    fonts = tmp_path / "fonts"
+    database = tmp_path / "index.sqlite"
+    write_font(fonts / "one.bdf", family="One")
+    write_font(fonts / "two.bdf", family="Two")
+    update_index(str(fonts), str(database))
+
+    write_font(fonts / "one.bdf", family="Uno Mas", bar="40")
+    (fonts / "two.bdf").unlink()
+    (fonts / "three.bdf").write_text("not a font")
+
+    summary = update_index(str(fonts), str(database))
+
+    assert (summary["indexed"], summary["removed"], summary["failed"]) == (1, 1, 1)
+    assert summary["unchanged"] == 0
+    assert query(database, "SELECT path, family, error IS NOT NULL FROM fonts ORDER BY path") == [
+        ("one.bdf", "Uno Mas", 0),
+        ("three.bdf", None, 1),
+    ]
+    assert summary["glyphs"] == 3
+
+    summary = update_index(str(fonts), str(database))
+    assert (summary["indexed"], summary["unchanged"]) == (0, 2)
+
+def test_index_command(tmp_path):
+    write_font(tmp_path / "fonts" / "font.bdf")
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert index {tmp_path / 'fonts'}",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.returncode == 0
+    assert "1 indexed, 0 unchanged, 0 removed, 0 failed" in process.stderr
+    assert (tmp_path / "fonts" / "bdf2ttf-index.sqlite").exists()
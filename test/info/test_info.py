@@ -0,0 +1,72 @@
+import json
+import subprocess
+from inspect import cleandoc
+
+from bdf2ttf.convert import font_info
+
+BDF = """
+    STARTFONT 2.1
+    FONT -Misc-Fixed-Bold-I-Normal--12-120-72-72-C-60-ISO10646-1
+    SIZE 12 72 72
+    FONTBOUNDINGBOX 6 12 0 -2
+    STARTPROPERTIES 6
+    FONT_ASCENT 10
+    FONT_DESCENT 2
+    FONT_VERSION "2.5"
+    CHARSET_REGISTRY "ISO10646"
+    CHARSET_ENCODING "1"
+    X_HEIGHT 6
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 6 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 6 0
+    BBX 1 3 1 0
+    BITMAP
+    this is not valid hex, and is never parsed
+    80
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def test_font_info(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    with open(in_file, "rb") as stream:
+        info = font_info(stream)
+
+    assert info["family"] == "Fixed"
+    assert info["style"] == "Bold Italic"
+    assert info["postscript_name"] == "Fixed-BoldItalic"
+    assert info["weight"] == 700
+    assert info["is_monospace"]
+    assert info["version"] == 2.5
+    assert info["font_size"] == 12
+    assert info["x_height"] == 6
+    assert info["glyph_count"] == 2
+
+def test_info_command(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(cleandoc(BDF))
+
+    process = subprocess.run(
+        f"cd {tmp_path}; python -m bdf2ttf.convert {in_file} --info",
+        shell=True,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    info = json.loads(process.stdout)
+    assert info["human_name"] == "Fixed Bold Italic"
+    assert info["glyph_count"] == 2
+
+    # Nothing should be converted
+    assert list(tmp_path.glob("*.ttf")) == []
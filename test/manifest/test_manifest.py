@@ -0,0 +1,92 @@
+import json
+import subprocess
+from inspect import cleandoc
+
+import pytest
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "{family}"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 1
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+def run_convert(in_file, out_file, manifest_file):
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert {in_file} -o {out_file} --manifest {manifest_file}",
+        shell=True,
+        stderr=subprocess.STDOUT,
+    )
+    if process.returncode:
+        pytest.fail("failed to convert")
+
+def test_unchanged_input_is_skipped(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    out_file = tmp_path / "out.ttf"
+    manifest_file = tmp_path / "out.manifest.json"
+    in_file.write_text(cleandoc(BDF.format(family="First")))
+
+    run_convert(in_file, out_file, manifest_file)
+    assert out_file.exists()
+
+    manifest = json.loads(manifest_file.read_text())
+    assert manifest["output"]["filename"] == str(out_file)
+    assert manifest["inputs"]["feature_file"] is None
+
+    first_mtime = out_file.stat().st_mtime_ns
+    run_convert(in_file, out_file, manifest_file)
+    assert out_file.stat().st_mtime_ns == first_mtime
+
+def test_changed_input_is_converted(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    out_file = tmp_path / "out.ttf"
+    manifest_file = tmp_path / "out.manifest.json"
+
+    in_file.write_text(cleandoc(BDF.format(family="First")))
+    run_convert(in_file, out_file, manifest_file)
+    first_fingerprint = json.loads(manifest_file.read_text())["fingerprint"]
+
+    in_file.write_text(cleandoc(BDF.format(family="Second")))
+    run_convert(in_file, out_file, manifest_file)
+    second_fingerprint = json.loads(manifest_file.read_text())["fingerprint"]
+
+    assert first_fingerprint != second_fingerprint
+
+def test_missing_output_is_converted(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    out_file = tmp_path / "out.ttf"
+    manifest_file = tmp_path / "out.manifest.json"
+    in_file.write_text(cleandoc(BDF.format(family="First")))
+
+    run_convert(in_file, out_file, manifest_file)
+    out_file.unlink()
+
+    run_convert(in_file, out_file, manifest_file)
+    assert out_file.exists()
+
+def test_input_from_pipe(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    out_file = tmp_path / "out.ttf"
+    manifest_file = tmp_path / "out.manifest.json"
+    in_file.write_text(cleandoc(BDF.format(family="First")))
+
+    subprocess.run(
+        f"cat {in_file} | python -m bdf2ttf.convert - -o {out_file} --manifest {manifest_file}",
+        shell=True,
+        check=True,
+    )
+
+    assert out_file.exists()
+    assert json.loads(manifest_file.read_text())["output"]["filename"] == str(out_file)
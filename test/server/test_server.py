@@ -0,0 +1,89 @@
+import io
+import subprocess
+import sys
+import time
+from inspect import cleandoc
+
+import pytest
+
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.client import ServerError, convert_remote
+
+BDF = cleandoc("""
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "Served"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 1
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """)
+
+@pytest.fixture
+def server(tmp_path):
+    socket_path = tmp_path / "bdf2ttf.sock"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bdf2ttf.server", "--socket", str(socket_path),
+            "--max-concurrent", "2", "--idle-timeout", "3"],
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 20
+    while not socket_path.exists():
+        assert time.monotonic() < deadline, "server didn't start"
+        time.sleep(0.1)
+
+    yield process, str(socket_path)
+
+    process.terminate()
+    process.wait()
+
+def test_convert_bytes_and_paths(server, tmp_path):
+    _, socket_path = server
+
+    font = TTFont(io.BytesIO(convert_remote(socket_path, bdf_data=BDF.encode())))
+    assert font["name"].getDebugName(1) == "Served"
+
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(BDF)
+    font = TTFont(io.BytesIO(convert_remote(socket_path, path=str(in_file))))
+    assert font["name"].getDebugName(1) == "Served"
+
+def test_errors_are_reported(server):
+    _, socket_path = server
+
+    with pytest.raises(ServerError):
+        convert_remote(socket_path, bdf_data=b"STARTFONT 2.1\n")
+
+    # The daemon is still running
+    assert convert_remote(socket_path, bdf_data=BDF.encode())
+
+def test_client_command(server, tmp_path):
+    _, socket_path = server
+    in_file = tmp_path / "in_file.bdf"
+    in_file.write_text(BDF)
+    out_file = tmp_path / "out.ttf"
+
+    subprocess.run(
+        [sys.executable, "-m", "bdf2ttf.client", str(in_file), "-o", str(out_file),
+            "--socket", socket_path],
+        check=True,
+    )
+
+    assert TTFont(out_file)["name"].getDebugName(1) == "Served"
+
+def test_idle_shutdown(server, tmp_path):
+    process, socket_path = server
+
+    assert process.wait(timeout=20) == 0
+    assert not (tmp_path / "bdf2ttf.sock").exists()
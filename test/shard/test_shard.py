@@ -0,0 +1,76 @@
+import subprocess
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+from bdf2ttf.shard import split_by_blocks, split_by_ranking, unicode_range
+
+GLYPH = """
+    STARTCHAR {name}
+    ENCODING {codepoint}
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    80
+    ENDCHAR
+    """
+
+def write_font(path, codepoints):
+    glyphs = "".join(
+        cleandoc(GLYPH.format(name=f"uni{codepoint:04X}", codepoint=codepoint)) + "\n"
+        for codepoint in codepoints
+    )
+    path.write_text(cleandoc("""
+        STARTFONT 2.1
+        SIZE 8 72 72
+        FONTBOUNDINGBOX 4 8 0 -1
+        STARTPROPERTIES 3
+        FAMILY_NAME "Shards"
+        FONT_ASCENT 7
+        FONT_DESCENT 1
+        ENDPROPERTIES
+        """) + f"\nCHARS {len(codepoints)}\n" + glyphs + "ENDFONT\n")
+
+def test_split_by_blocks():
+    latin = list(range(0x41, 0x45))
+    box_drawing = list(range(0x2500, 0x2503))
+    cjk = list(range(0x4E00, 0x4E07))
+
+    assert split_by_blocks(latin + box_drawing, 8) == [latin + box_drawing]
+    assert split_by_blocks(latin + box_drawing, 5) == [latin, box_drawing]
+    # A block bigger than a shard is split
+    assert split_by_blocks(latin + cjk, 5) == [latin, cjk[:5], cjk[5:]]
+
+def test_split_by_ranking():
+    codepoints = [0x41, 0x42, 0x43, 0x44]
+
+    assert split_by_ranking(codepoints, "DZB", 2) == [[0x42, 0x44], [0x41, 0x43]]
+
+def test_unicode_range():
+    assert unicode_range([0x20, 0x21, 0x22, 0x41, 0x2500, 0x2501]) == "U+20-22, U+41, U+2500-2501"
+
+def test_shard_command(tmp_path):
+    in_file = tmp_path / "font.bdf"
+    write_font(in_file, [*range(0x41, 0x45), *range(0x2500, 0x2504)])
+    out_dir = tmp_path / "web"
+
+    process = subprocess.run(
+        f"python -m bdf2ttf.convert shard {in_file} -d {out_dir} --max-glyphs 4 --format woff,ttf",
+        shell=True,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert process.returncode == 0, process.stderr
+
+    first = TTFont(out_dir / "font.0.woff")
+    second = TTFont(out_dir / "font.1.ttf")
+    assert set(first.getBestCmap()) == set(range(0x41, 0x45))
+    assert set(second.getBestCmap()) == set(range(0x2500, 0x2504))
+    assert first["hhea"].ascent == second["hhea"].ascent
+
+    css = (out_dir / "font.css").read_text()
+    assert css.count("@font-face") == 2
+    assert 'font-family: "Shards";' in css
+    assert 'src: url("font.0.woff") format("woff"), url("font.0.ttf") format("truetype");' in css
+    assert "unicode-range: U+41-44;" in css
+    assert "unicode-range: U+2500-2503;" in css
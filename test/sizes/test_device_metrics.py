@@ -0,0 +1,78 @@
+import pytest
+
+from bdf2ttf.device_metrics import parse_ppems, resolve_ppems
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 12 72 72
+    FONTBOUNDINGBOX 6 12 0 -2
+    STARTPROPERTIES 2
+    FONT_ASCENT 10
+    FONT_DESCENT 2
+    ENDPROPERTIES
+    CHARS 2
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 6 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    STARTCHAR bar
+    ENCODING 124
+    DWIDTH 5 0
+    BBX 1 11 2 -2
+    BITMAP
+    80
+    80
+    80
+    80
+    80
+    80
+    80
+    80
+    80
+    80
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def test_parse_ppems():
+    assert parse_ppems("1x, 2X,24") == [(1, True), (2, True), (24, False)]
+    assert parse_ppems("none") == []
+    assert resolve_ppems(parse_ppems("1x,2x,12,30x"), 12) == [12, 24]
+
+    with pytest.raises(ValueError):
+        parse_ppems("0x")
+    with pytest.raises(ValueError):
+        parse_ppems("big")
+
+def test_common_device_metrics(convert_str):
+    font = convert_str(BDF, extra_args="--device-metrics 1x,2x,3x,4x")
+
+    hdmx = font["hdmx"].hdmx
+    assert sorted(hdmx) == [12, 24, 36, 48]
+    for scale in (1, 2, 3, 4):
+        assert hdmx[12 * scale]["space"] == 6 * scale
+        assert hdmx[12 * scale]["bar"] == 5 * scale
+
+    assert set(font["LTSH"].yPels.values()) == {1}
+
+    (ratio,) = font["VDMX"].ratRanges
+    assert ratio["bCharSet"] == 0
+    (group,) = font["VDMX"].groups
+    assert group == {12: (9, -2), 24: (18, -4), 36: (27, -6), 48: (36, -8)}
+
+def test_chosen_device_metrics(convert_str):
+    font = convert_str(BDF, extra_args="--device-metrics 2x,16")
+
+    assert sorted(font["hdmx"].hdmx) == [16, 24]
+    assert font["hdmx"].hdmx[16]["bar"] == round(5 * 16 / 12)
+    assert sorted(font["VDMX"].groups[0]) == [16, 24]
+
+@pytest.mark.parametrize("extra_args", ["", "--device-metrics none"])
+def test_no_device_metrics(convert_str, extra_args):
+    font = convert_str(BDF, extra_args=extra_args)
+
+    for tag in ("hdmx", "LTSH", "VDMX"):
+        assert tag not in font
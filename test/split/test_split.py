@@ -0,0 +1,112 @@
+from inspect import cleandoc
+
+import pytest
+
+from fontTools.ttLib import TTCollection, TTFont
+
+import bdf2ttf
+
+from bdf2ttf import build, convert
+from bdf2ttf.split import split_by_planes, split_font
+
+GLYPH = """
+    STARTCHAR {name}
+    ENCODING {codepoint}
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    80
+    ENDCHAR
+    """
+
+CODEPOINTS = [0x41, 0x42, 0x43, 0x3B1, 0x3B2, 0x1F600, 0x1F601, 0x20000]
+
+def write_font(path):
+    glyphs = [(f"u{codepoint:04X}", codepoint) for codepoint in CODEPOINTS]
+    glyphs.append(("A.alt", -1))
+    path.write_text(cleandoc(f"""
+        STARTFONT 2.1
+        SIZE 8 72 72
+        FONTBOUNDINGBOX 4 8 0 -1
+        STARTPROPERTIES 3
+        FAMILY_NAME "Huge"
+        FONT_ASCENT 7
+        FONT_DESCENT 1
+        ENDPROPERTIES
+        CHARS {len(glyphs)}
+        """) + "\n" + "".join(
+        cleandoc(GLYPH.format(name=name, codepoint=codepoint)) + "\n"
+        for name, codepoint in glyphs
+    ) + "ENDFONT\n")
+
+def test_split_by_planes():
+    assert split_by_planes(CODEPOINTS, 4) == [
+        [0x41, 0x42, 0x43],
+        [0x3B1, 0x3B2],
+        [0x1F600, 0x1F601, 0x20000],
+    ]
+    assert split_by_planes(CODEPOINTS, 100) == [CODEPOINTS]
+
+def test_split_font(tmp_path):
+    in_file = tmp_path / "huge.bdf"
+    write_font(in_file)
+
+    filenames = split_font(str(in_file), str(tmp_path / "Huge.ttf"), max_glyphs=6, jobs=1)
+    assert filenames == [str(tmp_path / f"Huge.{number}.ttf") for number in (1, 2, 3)]
+
+    fonts = [TTFont(filename) for filename in filenames]
+    assert [font.getGlyphOrder() for font in fonts] == [
+        [".notdef", "u0041", "u0042", "u0043", "A.alt"],
+        [".notdef", "u03B1", "u03B2"],
+        [".notdef", "u1F600", "u1F601", "u20000"],
+    ]
+
+    for number, font in enumerate(fonts, 1):
+        assert font["name"].getDebugName(1) == "Huge"
+        assert font["name"].getDebugName(4).endswith(f" Part {number}")
+        assert font["name"].getDebugName(6).endswith(f"-Part{number}")
+        assert font["hhea"].ascent == fonts[0]["hhea"].ascent
+
+def test_split_collection(tmp_path):
+    in_file = tmp_path / "huge.bdf"
+    write_font(in_file)
+    out_file = tmp_path / "Huge.ttc"
+
+    assert split_font(str(in_file), str(out_file), max_glyphs=6, jobs=2) == [str(out_file)]
+
+    collection = TTCollection(str(out_file))
+    assert len(collection.fonts) == 3
+    assert set().union(*(font["cmap"].getBestCmap() for font in collection.fonts)) == set(CODEPOINTS)
+
+def test_split_automatically(tmp_path, monkeypatch):
+    in_file = tmp_path / "huge.bdf"
+    write_font(in_file)
+    monkeypatch.setattr(convert, "MAX_GLYPHS", 6)
+
+    filenames = convert.convert_bdf_file(str(in_file), str(tmp_path / "Huge.ttf"))
+    assert len(filenames) == 3
+
+    with pytest.raises(ValueError):
+        convert.convert_bdf_file(str(in_file), "-")
+
+def test_split_in_converter(tmp_path, monkeypatch):
+    in_file = tmp_path / "huge.bdf"
+    write_font(in_file)
+    monkeypatch.setattr(convert, "MAX_GLYPHS", 6)
+
+    with bdf2ttf.Converter(max_workers=1) as converter:
+        ((infile, font_filename, error),) = converter.convert_many([str(in_file)], tmp_path / "out")
+
+    assert error is None
+    assert font_filename == ", ".join(
+        str(tmp_path / "out" / f"huge.{number}.ttf") for number in (1, 2, 3)
+    )
+
+def test_split_in_build(tmp_path, monkeypatch):
+    in_file = tmp_path / "huge.bdf"
+    write_font(in_file)
+    monkeypatch.setattr(convert, "MAX_GLYPHS", 6)
+
+    output = str(tmp_path / "build" / "Huge.ttf")
+    assert build.build_font(str(in_file), output, None, str(tmp_path / "state.json"), None)
+    assert (tmp_path / "build" / "Huge.3.ttf").exists()
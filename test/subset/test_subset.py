@@ -0,0 +1,101 @@
+from inspect import cleandoc
+
+import pytest
+
+from bdf2ttf.subset import GlyphFilter, feature_glyphs, parse_unicodes
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 8 72 72
+    FONTBOUNDINGBOX 4 8 0 -1
+    STARTPROPERTIES 2
+    FONT_ASCENT 7
+    FONT_DESCENT 1
+    ENDPROPERTIES
+    CHARS 5
+    STARTCHAR A
+    ENCODING 65
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    80
+    ENDCHAR
+    STARTCHAR B
+    ENCODING 66
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    80
+    ENDCHAR
+    STARTCHAR C
+    ENCODING 67
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    this is not valid hex, and is never parsed
+    ENDCHAR
+    STARTCHAR A.alt
+    ENCODING -1
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    80
+    ENDCHAR
+    STARTCHAR boxvert
+    ENCODING 9474
+    DWIDTH 4 0
+    BBX 1 1 0 0
+    BITMAP
+    80
+    ENDCHAR
+    ENDFONT
+    """
+
+def test_parse_unicodes():
+    assert parse_unicodes("U+0041-0043, 2502 u+00a0") == {0x41, 0x42, 0x43, 0x2502, 0xA0}
+
+    with pytest.raises(ValueError):
+        parse_unicodes("U+0043-0041")
+    with pytest.raises(ValueError):
+        parse_unicodes("A-Z")
+
+def test_feature_glyphs():
+    assert feature_glyphs(cleandoc("""
+        @letters = [A B];
+        feature ss01 {
+            sub @letters by A.alt;
+            sub C' boxvert by B;
+            sub A B by A_B;
+            sub C by C.a C.b;
+        } ss01;
+        """)) == {"A", "B", "C", "A.alt", "boxvert", "A_B", "C.a", "C.b"}
+
+def test_unicodes(convert_str):
+    font = convert_str(BDF, extra_args="--unicodes U+0041,2502")
+
+    assert font.getGlyphOrder() == [".notdef", "A", "boxvert"]
+    assert font.getBestCmap() == {0x41: "A", 0x2502: "boxvert"}
+
+def test_text_and_glyphs(convert_str):
+    font = convert_str(BDF, extra_args="--text AB --glyphs A.alt")
+
+    assert font.getGlyphOrder() == [".notdef", "A", "B", "A.alt"]
+
+def test_feature_glyphs_are_kept(convert_str):
+    font = convert_str(BDF, """
+        languagesystem DFLT dflt;
+        feature ss01 {
+            sub A by A.alt;
+        } ss01;
+        """, extra_args="--text A")
+
+    assert font.getGlyphOrder() == [".notdef", "A", "A.alt"]
+    assert font["GSUB"].table.LookupList.Lookup[0].SubTable[0].mapping == {"A": "A.alt"}
+
+def test_glyph_filter_keeps():
+    glyph_filter = GlyphFilter.from_options(unicodes="41", glyphs="A.alt, B")
+
+    assert glyph_filter.keeps(".notdef", None)
+    assert glyph_filter.keeps("A", 0x41)
+    assert glyph_filter.keeps("B", 0x42)
+    assert not glyph_filter.keeps("C", 0x43)
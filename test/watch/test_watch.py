@@ -0,0 +1,80 @@
+import subprocess
+import sys
+import time
+from inspect import cleandoc
+
+from fontTools.ttLib import TTFont
+
+BDF = """
+    STARTFONT 2.1
+    SIZE 1 72 72
+    FONTBOUNDINGBOX 0 0 0 0
+    STARTPROPERTIES 3
+    FAMILY_NAME "{family}"
+    FONT_ASCENT 1
+    FONT_DESCENT 0
+    ENDPROPERTIES
+    CHARS 1
+    STARTCHAR space
+    ENCODING 32
+    DWIDTH 1 0
+    BBX 0 0 0 0
+    BITMAP
+    ENDCHAR
+    ENDFONT
+    """
+
+def wait_for(condition, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+def family_name(font_file):
+    try:
+        return TTFont(font_file)["name"].getDebugName(1)
+    except Exception:
+        return None
+
+def test_watch_reconverts_on_save(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    out_file = tmp_path / "out.ttf"
+    in_file.write_text(cleandoc(BDF.format(family="First")))
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bdf2ttf.convert", str(in_file), "-o", str(out_file), "--watch"],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        assert wait_for(lambda: family_name(out_file) == "First")
+
+        in_file.write_text(cleandoc(BDF.format(family="Second")))
+        assert wait_for(lambda: family_name(out_file) == "Second")
+
+        # Temporary files are never left behind
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["in_file.bdf", "out.ttf"]
+    finally:
+        process.terminate()
+        process.wait()
+
+def test_watch_passes_options(tmp_path):
+    in_file = tmp_path / "in_file.bdf"
+    out_file = tmp_path / "out.ttf"
+    in_file.write_text(cleandoc(BDF.format(family="First")))
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bdf2ttf.convert", str(in_file), "-o", str(out_file), "--watch",
+            "--post-format", "3", "--device-metrics", "none"],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        assert wait_for(lambda: family_name(out_file) == "First")
+
+        font = TTFont(out_file)
+        assert font["post"].formatType == 3.0
+        assert "hdmx" not in font
+    finally:
+        process.terminate()
+        process.wait()